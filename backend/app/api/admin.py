@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from fastapi import APIRouter
+
+from ..db import crud, schemas, session
+from ..services import jobs
+
+router = APIRouter()
+
+# These endpoints act on every venue at once; each venue runs on its own
+# session and thread, so one slow shard does not serialize the others.
+
+
+def _submit_everywhere(kind: str) -> dict[str, schemas.Job]:
+    return session.fan_out(
+        lambda db: schemas.Job.model_validate(jobs.submit(db, kind), from_attributes=True)
+    )
+
+
+@router.get("/venues", response_model=list[str])
+def list_venues():
+    return session.list_venues()
+
+
+@router.post("/export", response_model=dict[str, schemas.Job], status_code=202)
+def export_all():
+    return _submit_everywhere("export")
+
+
+@router.post("/aggregate-synonyms", response_model=dict[str, schemas.Job], status_code=202)
+def aggregate_all():
+    return _submit_everywhere("aggregate-synonyms")
+
+
+@router.get("/report", response_model=dict[str, schemas.VenueReport])
+def report(since: datetime | None = None, limit: int = 5):
+    return session.fan_out(lambda db: crud.get_report(db, since=since, limit=limit))
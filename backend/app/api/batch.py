@@ -0,0 +1,123 @@
+import json
+import logging
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from starlette.middleware.exceptions import ExceptionMiddleware
+
+from ..db import schemas, session
+
+router = APIRouter()
+
+MAX_BATCH_SIZE = 20
+
+
+async def _dispatch(
+    request: Request, item: schemas.BatchRequestItem, state: dict
+) -> schemas.BatchResponseItem:
+    """Run one sub-request through the router without another HTTP round trip."""
+    if item.method.upper() != "GET":
+        return schemas.BatchResponseItem(
+            id=item.id, status=405, body={"detail": "Only GET requests can be batched"}
+        )
+    url = urlsplit(item.path)
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.url.scheme,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": "",
+        "query_string": url.query.encode(),
+        "headers": [
+            (k, v) for k, v in request.scope["headers"] if k in (b"host", b"accept")
+        ],
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "app": request.app,
+        "state": state,
+    }
+    status = 500
+    chunks: list[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    # Wrap the router in the app's exception handlers so HTTPException and
+    # validation errors become 404/422 responses as they would over HTTP.
+    app = ExceptionMiddleware(request.app.router, handlers=request.app.exception_handlers)
+    try:
+        await app(scope, receive, send)
+    except session.ReadOnlySession:
+        # Drop whatever the handler staged so later sub-requests start clean.
+        db = state["batch_session"]
+        for obj in [*db.new, *db.dirty]:
+            db.expunge(obj)
+        return schemas.BatchResponseItem(
+            id=item.id, status=409, body={"detail": "Request writes and cannot be batched"}
+        )
+    except Exception:
+        logging.exception("Unhandled error in batched %s", item.path)
+        return schemas.BatchResponseItem(
+            id=item.id, status=500, body={"detail": "Internal Server Error"}
+        )
+    body = b"".join(chunks)
+    try:
+        parsed = json.loads(body) if body else None
+    except ValueError:
+        parsed = body.decode(errors="replace")
+    return schemas.BatchResponseItem(id=item.id, status=status, body=parsed)
+
+
+def _begin(db: Session) -> None:
+    # SQLite only starts a transaction before writes, so open one explicitly:
+    # every sub-request then reads from the same snapshot even if an inventory
+    # PATCH commits halfway through the batch.
+    db.info["read_only"] = True
+    db.connection().exec_driver_sql("BEGIN")
+
+
+def _end(db: Session) -> None:
+    db.rollback()
+    db.info.pop("read_only", None)
+
+
+@router.post("/", response_model=schemas.BatchResponse)
+async def run_batch(
+    batch: schemas.BatchRequest,
+    request: Request,
+    db: Session = Depends(session.get_db),
+):
+    """Run GET sub-requests in order against one read-only snapshot.
+
+    Sub-requests share one session and SQLite connection, which execute one
+    statement at a time anyway, so they run one after another; sync handlers
+    still run on the threadpool and never block the event loop.  Handlers
+    that write get a 409, and coalescing is skipped so every result comes
+    from this snapshot.
+    """
+    if len(batch.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_SIZE} requests per batch"
+        )
+    await run_in_threadpool(_begin, db)
+    state = {
+        "venue": getattr(request.state, "venue", session.DEFAULT_VENUE),
+        "batch_session": db,
+    }
+    try:
+        responses = [await _dispatch(request, item, state) for item in batch.requests]
+    finally:
+        await run_in_threadpool(_end, db)
+    return {"responses": responses}
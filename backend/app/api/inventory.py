@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..db import crud, schemas, session
+from ..services import jobs
 
 router = APIRouter()
 
@@ -20,11 +21,22 @@ def list_items(
     )
 
 
-@router.post("/aggregate-synonyms", status_code=200)
+@router.post("/aggregate-synonyms", response_model=schemas.Job, status_code=202)
 def aggregate_synonyms(db: Session = Depends(session.get_db)):
-    """Aggregate inventory items using current synonyms."""
-    crud.aggregate_inventory_by_synonyms(db)
-    return {"status": "ok"}
+    """Queue aggregation of inventory items using current synonyms."""
+    return jobs.submit(db, "aggregate-synonyms")
+
+
+@router.post("/import", response_model=schemas.Job, status_code=202)
+def import_items(
+    items: list[schemas.InventoryImportItem], db: Session = Depends(session.get_db)
+):
+    """Queue a bulk import of quantities keyed by ingredient name."""
+    if not items:
+        raise HTTPException(status_code=400, detail="No data provided")
+    return jobs.submit(
+        db, "import-inventory", {"items": [i.model_dump() for i in items]}
+    )
 
 
 @router.post("/", response_model=schemas.InventoryItem, status_code=201)
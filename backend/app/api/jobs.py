@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from ..db import schemas, session
+from ..services import jobs
+
+router = APIRouter()
+
+
+@router.get("/", response_model=list[schemas.Job])
+def list_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    status: str | None = None,
+    db: Session = Depends(session.get_db),
+):
+    return jobs.list_jobs(db, skip=skip, limit=limit, status=status)
+
+
+@router.post("/", response_model=schemas.Job, status_code=202)
+def submit_job(job: schemas.JobCreate, db: Session = Depends(session.get_db)):
+    if job.kind not in jobs.JOB_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {job.kind}")
+    try:
+        return jobs.submit(db, job.kind, job.payload)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False))
+
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def get_job(job_id: int, db: Session = Depends(session.get_db)):
+    job = jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.Job)
+def cancel_job(job_id: int, db: Session = Depends(session.get_db)):
+    job = jobs.cancel(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
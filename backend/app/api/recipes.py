@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..db import crud, schemas, session
+from ..services import coalesce
 
 router = APIRouter()
 
@@ -19,6 +20,28 @@ def get_recipe(recipe_id: int, db: Session = Depends(session.get_db)):
     return recipe
 
 
+@router.get("/{recipe_id}/similar", response_model=list[schemas.SimilarRecipe])
+def get_similar_recipes(
+    recipe_id: int,
+    limit: int = 10,
+    available_only: bool = False,
+    db: Session = Depends(session.get_db),
+):
+    similar = coalesce.run(
+        db,
+        "recipes/similar",
+        lambda: crud.get_similar_recipes(
+            db, recipe_id, limit=limit, available_only=available_only
+        ),
+        recipe_id=recipe_id,
+        limit=limit,
+        available_only=available_only,
+    )
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return similar
+
+
 @router.post("/", response_model=schemas.Recipe, status_code=201)
 def create_recipe(recipe: schemas.RecipeCreate, db: Session = Depends(session.get_db)):
     db_recipe = crud.create_recipe(db, recipe)
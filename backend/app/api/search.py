@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..db import crud, schemas, session
+
+router = APIRouter()
+
+
+@router.get("/", response_model=schemas.RecipeBrowse)
+def search_recipes(
+    q: str | None = None,
+    tag: list[str] = Query(default=[]),
+    category: list[str] = Query(default=[]),
+    glass: list[str] = Query(default=[]),
+    alcoholic: list[str] = Query(default=[]),
+    iba: list[str] = Query(default=[]),
+    available_only: bool = False,
+    order_missing: bool = False,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(session.get_db),
+):
+    """Filter recipes by facet values and return counts for every facet.
+
+    Repeating a parameter ORs its values; different facets are ANDed.
+    ``available_only`` keeps recipes with every ingredient in stock and
+    ``order_missing`` sorts by the number of missing ingredients.
+    """
+    filters = {
+        "tag": tag,
+        "category": category,
+        "glass": glass,
+        "alcoholic": alcoholic,
+        "iba": iba,
+    }
+    return crud.browse_recipes(
+        db,
+        filters,
+        q=q,
+        skip=skip,
+        limit=limit,
+        available_only=available_only,
+        order_missing=order_missing,
+    )
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from ..db import crud, schemas, session
+
+router = APIRouter()
+
+
+@router.get("/consumption", response_model=list[schemas.ConsumptionBucket])
+def get_consumption(
+    period: Literal["hour", "day", "week"] = "day",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    ingredient_id: int | None = None,
+    db: Session = Depends(session.get_db),
+):
+    return crud.get_consumption(
+        db, period=period, since=since, until=until, ingredient_id=ingredient_id
+    )
+
+
+@router.get("/top", response_model=list[schemas.ConsumptionTotal])
+def get_top_consumed(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 10,
+    db: Session = Depends(session.get_db),
+):
+    return crud.get_top_consumed(db, since=since, until=until, limit=limit)
+
+
+@router.get("/events", response_model=list[schemas.InventoryEvent])
+def list_events(
+    ingredient_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(session.get_db),
+):
+    return crud.list_inventory_events(db, ingredient_id=ingredient_id, skip=skip, limit=limit)
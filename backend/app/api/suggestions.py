@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from ..db import crud, schemas, session
+from ..services import coalesce
 
 router = APIRouter()
 
@@ -14,7 +15,13 @@ def get_suggestions(
     max_missing: Optional[int] = None,
     db: Session = Depends(session.get_db),
 ):
-    return crud.get_suggestions(db, limit=limit, max_missing=max_missing)
+    return coalesce.run(
+        db,
+        "suggestions",
+        lambda: crud.get_suggestions(db, limit=limit, max_missing=max_missing),
+        limit=limit,
+        max_missing=max_missing,
+    )
 
 
 @router.get("/by-ingredients", response_model=list[schemas.RecipeSuggestion])
@@ -25,9 +32,17 @@ def get_suggestions_by_ingredients(
     limit: int = 50,
     db: Session = Depends(session.get_db),
 ):
-    return crud.get_suggestions_by_ingredients(
+    return coalesce.run(
         db,
-        ingredient_ids=ingredients,
+        "suggestions/by-ingredients",
+        lambda: crud.get_suggestions_by_ingredients(
+            db,
+            ingredient_ids=ingredients,
+            mode=mode,
+            max_missing=max_missing,
+            limit=limit,
+        ),
+        ingredients=ingredients,
         mode=mode,
         max_missing=max_missing,
         limit=limit,
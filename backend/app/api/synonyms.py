@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi import Body
+from sqlalchemy.orm import Session
 
-from ..services import synonyms
-from ..db import schemas
+from ..services import jobs, synonyms
+from ..db import schemas, session
 
 router = APIRouter()
 
@@ -25,9 +26,11 @@ def delete_synonym(alias: str):
     return None
 
 
-@router.post("/import", status_code=201)
-def import_synonym_data(data: dict[str, str] = Body(...)):
+@router.post("/import", response_model=schemas.Job, status_code=202)
+def import_synonym_data(
+    data: dict[str, str] = Body(...), db: Session = Depends(session.get_db)
+):
+    """Queue an import of alias to canonical name mappings."""
     if not data:
         raise HTTPException(status_code=400, detail="No data provided")
-    synonyms.import_synonyms(data)
-    return {"imported": len(data)}
+    return jobs.submit(db, "import-synonyms", data)
@@ -1,10 +1,27 @@
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+
 from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from ..services import synonyms
 from . import models, schemas
 
 
+# Progress callbacks receive (done, total); long-running helpers call them so
+# background jobs can report progress and abort between steps.
+Progress = Callable[[int, int], None]
+
+
+# Data version
+
+def get_data_version(db: Session, key: int = models.CATALOG_VERSION) -> int:
+    row = db.query(models.DataVersion).filter(models.DataVersion.id == key).first()
+    return row.version if row else 0
+
+
 # Ingredient CRUD
 
 def get_ingredient(db: Session, ingredient_id: int):
@@ -50,6 +67,18 @@ def get_or_create_ingredient(db: Session, ingredient: schemas.IngredientCreate):
     return create_ingredient(db, ingredient)
 
 
+def _get_or_add_ingredient(db: Session, name: str) -> models.Ingredient:
+    # Like get_or_create_ingredient but only flushes, so bulk operations stay
+    # one transaction and a cancelled job leaves nothing behind.
+    existing = get_ingredient_by_name(db, name)
+    if existing:
+        return existing
+    ing = models.Ingredient(name=synonyms.canonical_name(name))
+    db.add(ing)
+    db.flush()
+    return ing
+
+
 # Recipe CRUD
 
 def get_recipe(db: Session, recipe_id: int):
@@ -82,31 +111,183 @@ def get_recipe_with_inventory(db: Session, recipe_id: int):
     return schemas.RecipeDetail(**base, ingredients=ingredients)
 
 
+def _get_or_create_named(db: Session, model, name: str):
+    obj = db.query(model).filter(model.name == name).first()
+    if not obj:
+        obj = model(name=name)
+        db.add(obj)
+        db.flush()
+    return obj
+
+
+def _unique(names: list[str]) -> list[str]:
+    # Association rows are unique per recipe, so repeats must collapse.
+    return list(dict.fromkeys(n.strip() for n in names if n.strip()))
+
+
 def create_recipe(db: Session, recipe: schemas.RecipeCreate):
-    data = recipe.model_dump(exclude={"ingredients"})
+    from ..services import facets, similarity
+
+    data = recipe.model_dump(
+        exclude={"ingredients", "glass", "alcoholic", "tags", "categories", "ibas"}
+    )
     db_obj = models.Recipe(**data)
     db_obj.ingredients = [
         models.RecipeIngredient(name=i.name, measure=i.measure) for i in recipe.ingredients
     ]
+    if recipe.glass and recipe.glass.strip():
+        db_obj.glass = _get_or_create_named(db, models.Glass, recipe.glass.strip())
+    if recipe.alcoholic and recipe.alcoholic.strip():
+        db_obj.alcoholic = _get_or_create_named(
+            db, models.Alcoholic, recipe.alcoholic.strip()
+        )
+    db_obj.tags = [_get_or_create_named(db, models.Tag, t) for t in _unique(recipe.tags)]
+    db_obj.categories = [
+        _get_or_create_named(db, models.Category, c) for c in _unique(recipe.categories)
+    ]
+    db_obj.ibas = [_get_or_create_named(db, models.Iba, i) for i in _unique(recipe.ibas)]
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    facets.add_recipe(db, db_obj)
+    similarity.add_recipe(db, db_obj)
     return db_obj
 
 
+def _recipe_options():
+    from sqlalchemy.orm import selectinload
+
+    return (
+        selectinload(models.Recipe.ingredients),
+        selectinload(models.Recipe.glass),
+        selectinload(models.Recipe.alcoholic),
+        selectinload(models.Recipe.tags),
+        selectinload(models.Recipe.categories),
+        selectinload(models.Recipe.ibas),
+    )
+
+
 def list_recipes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Recipe).offset(skip).limit(limit).all()
+    return (
+        db.query(models.Recipe)
+        .options(*_recipe_options())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
 
 def delete_recipe(db: Session, recipe_id: int) -> bool:
+    from ..services import facets, similarity
+
     recipe = get_recipe(db, recipe_id)
     if not recipe:
         return False
     db.delete(recipe)
     db.commit()
+    facets.remove_recipe(db, recipe_id)
+    similarity.remove_recipe(db, recipe_id)
     return True
 
 
+def get_similar_recipes(
+    db: Session,
+    recipe_id: int,
+    limit: int = 10,
+    available_only: bool = False,
+) -> list[dict] | None:
+    from sqlalchemy.orm import selectinload
+
+    from ..services import similarity
+
+    recipe = get_recipe(db, recipe_id)
+    if not recipe:
+        return None
+
+    available = None
+    if available_only:
+        inventory = (
+            db.query(models.InventoryItem)
+            .options(selectinload(models.InventoryItem.ingredient))
+            .filter(models.InventoryItem.quantity > 0)
+            .all()
+        )
+        available = {
+            synonyms.canonical_name(item.ingredient.name).lower() for item in inventory
+        }
+
+    scored = similarity.similar(db, recipe, limit=limit, available=available)
+    by_id = {
+        r.id: r
+        for r in db.query(models.Recipe).filter(
+            models.Recipe.id.in_([rid for rid, _ in scored])
+        )
+    }
+    return [
+        {
+            "id": rid,
+            "name": by_id[rid].name,
+            "thumb": by_id[rid].thumb,
+            "similarity": round(score, 4),
+        }
+        for rid, score in scored
+        if rid in by_id
+    ]
+
+
+def browse_recipes(
+    db: Session,
+    filters: dict[str, list[str]],
+    q: str | None = None,
+    skip: int = 0,
+    limit: int = 50,
+    available_only: bool = False,
+    order_missing: bool = False,
+) -> dict:
+    from ..services import facets
+
+    available = order = None
+    if available_only or order_missing:
+        # Suggestions rank every recipe with ingredients by (missing, name),
+        # served from the snapshot when it is current.
+        total_recipes = db.query(func.count(models.Recipe.id)).scalar()
+        ranked = get_suggestions(db, limit=total_recipes)
+        if available_only:
+            available = {r["id"] for r in ranked if r["missing_count"] == 0}
+        if order_missing:
+            order = [r["id"] for r in ranked]
+    page_ids, total, counts = facets.browse(
+        db, filters, q=q, skip=skip, limit=limit, available=available, order=order
+    )
+    by_id = {
+        r.id: r
+        for r in db.query(models.Recipe)
+        .options(*_recipe_options())
+        .filter(models.Recipe.id.in_(page_ids))
+    }
+    return {
+        "total": total,
+        "recipes": [by_id[i] for i in page_ids if i in by_id],
+        "facets": counts,
+    }
+
+
+# Recipe dimensions
+
+def list_tags(db: Session, skip: int = 0, limit: int = 100):
+    return db.query(models.Tag).order_by(models.Tag.name).offset(skip).limit(limit).all()
+
+
+def list_categories(db: Session, skip: int = 0, limit: int = 100):
+    return (
+        db.query(models.Category)
+        .order_by(models.Category.name)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
 # InventoryItem CRUD
 
 def get_inventory_item(db: Session, item_id: int):
@@ -125,11 +306,14 @@ def create_inventory_item(db: Session, item: schemas.InventoryItemCreate):
     existing = get_inventory_by_ingredient(db, item.ingredient_id)
     if existing:
         existing.quantity += item.quantity
+        record_inventory_event(db, existing, item.quantity, "update")
         db.commit()
         db.refresh(existing)
         return existing
     db_obj = models.InventoryItem(**item.model_dump())
     db.add(db_obj)
+    db.flush()
+    record_inventory_event(db, db_obj, db_obj.quantity, "create")
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -155,8 +339,10 @@ def update_inventory_item(db: Session, item_id: int, item_update: schemas.Invent
     db_obj = get_inventory_item(db, item_id)
     if not db_obj:
         return None
+    before = db_obj.quantity or 0
     for field, value in item_update.model_dump(exclude_unset=True).items():
         setattr(db_obj, field, value)
+    record_inventory_event(db, db_obj, (db_obj.quantity or 0) - before, "update")
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -194,7 +380,79 @@ def list_inventory_items(
     return q.offset(skip).limit(limit).all()
 
 
-def aggregate_inventory_by_synonyms(db: Session) -> None:
+# Imports commit in chunks and pause briefly in between so request writers
+# (PATCHes during service) waiting on SQLite's lock get a turn.
+IMPORT_CHUNK_SIZE = 100
+IMPORT_CHUNK_PAUSE = 0.05
+
+
+def import_inventory_items(
+    db: Session,
+    items: list[schemas.InventoryImportItem],
+    progress: Progress | None = None,
+) -> int:
+    """Add quantities by ingredient name, merging into existing items.
+
+    A cancelled import keeps the chunks committed before it.
+    """
+    ingredients = {i.name.lower(): i for i in db.query(models.Ingredient)}
+    stock = {i.ingredient_id: i for i in db.query(models.InventoryItem)}
+    for done, entry in enumerate(items, 1):
+        name = synonyms.canonical_name(entry.name)
+        ing = ingredients.get(name.lower())
+        if ing is None:
+            ing = ingredients[name.lower()] = models.Ingredient(name=name)
+            db.add(ing)
+            db.flush()
+        existing = stock.get(ing.id)
+        if existing:
+            existing.quantity += entry.quantity
+        else:
+            existing = stock[ing.id] = models.InventoryItem(
+                ingredient_id=ing.id, quantity=entry.quantity, status="available"
+            )
+            db.add(existing)
+            db.flush()
+        record_inventory_event(db, existing, entry.quantity, "import")
+        if done % IMPORT_CHUNK_SIZE == 0 or done == len(items):
+            db.commit()
+            if progress:
+                progress(done, len(items))
+            if done < len(items):
+                time.sleep(IMPORT_CHUNK_PAUSE)
+    return len(items)
+
+
+def export_data(db: Session, progress: Progress | None = None) -> dict:
+    from sqlalchemy.orm import selectinload
+
+    ingredients = [
+        schemas.Ingredient.model_validate(i, from_attributes=True).model_dump()
+        for i in db.query(models.Ingredient).all()
+    ]
+    if progress:
+        progress(1, 3)
+    recipes = [
+        schemas.Recipe.model_validate(r, from_attributes=True).model_dump()
+        for r in db.query(models.Recipe).options(selectinload(models.Recipe.ingredients))
+    ]
+    if progress:
+        progress(2, 3)
+    inventory = [
+        schemas.InventoryItem.model_validate(i, from_attributes=True).model_dump()
+        for i in db.query(models.InventoryItem).all()
+    ]
+    if progress:
+        progress(3, 3)
+    return {
+        "ingredients": ingredients,
+        "recipes": recipes,
+        "inventory": inventory,
+        "synonyms": synonyms.list_synonyms(),
+    }
+
+
+def aggregate_inventory_by_synonyms(db: Session, progress: Progress | None = None) -> None:
     from sqlalchemy.orm import selectinload
 
     items = (
@@ -202,19 +460,24 @@ def aggregate_inventory_by_synonyms(db: Session) -> None:
         .options(selectinload(models.InventoryItem.ingredient))
         .all()
     )
-    for item in list(items):
+    for done, item in enumerate(list(items)):
+        if progress:
+            progress(done, len(items))
         canonical = synonyms.canonical_name(item.ingredient.name)
         if canonical == item.ingredient.name:
             continue
-        canon_ing = get_or_create_ingredient(db, schemas.IngredientCreate(name=canonical))
+        canon_ing = _get_or_add_ingredient(db, canonical)
         if item.ingredient_id == canon_ing.id:
             continue
         existing = get_inventory_by_ingredient(db, canon_ing.id)
+        record_inventory_event(db, item, -(item.quantity or 0), "transfer", quantity_after=0)
         if existing:
             existing.quantity += item.quantity
+            record_inventory_event(db, existing, item.quantity or 0, "transfer")
             db.delete(item)
         else:
             item.ingredient_id = canon_ing.id
+            record_inventory_event(db, item, item.quantity or 0, "transfer")
     db.commit()
 
     for ing in db.query(models.Ingredient).all():
@@ -232,11 +495,183 @@ def delete_inventory_item(db: Session, item_id: int) -> bool:
     item = get_inventory_item(db, item_id)
     if not item:
         return False
+    record_inventory_event(db, item, -(item.quantity or 0), "delete", quantity_after=0)
     db.delete(item)
     db.commit()
     return True
 
 
+# Inventory events and usage rollups
+
+# Only these kinds count as usage; transfers (synonym aggregation) and
+# deletions move or drop stock without anyone pouring it.
+_ROLLUP_KINDS = {"create", "update", "import"}
+ROLLUP_PERIODS = ("hour", "day", "week")
+
+
+def _bucket_start(ts: datetime, period: str) -> datetime:
+    if period == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def record_inventory_event(
+    db: Session,
+    item: models.InventoryItem,
+    delta: int,
+    kind: str,
+    quantity_after: int | None = None,
+) -> None:
+    """Append an event and update rollups; the caller commits.
+
+    Keeping this in the caller's transaction means the log and the rollups
+    can never disagree with the stored quantity.  ``quantity_after``
+    defaults to the item's quantity; pass it when the stock leaves the item's
+    ingredient, as when the item is deleted or moved.
+    """
+    if not delta:
+        return
+    if quantity_after is None:
+        quantity_after = item.quantity or 0
+    now = datetime.utcnow()
+    db.add(
+        models.InventoryEvent(
+            inventory_item_id=item.id,
+            ingredient_id=item.ingredient_id,
+            kind=kind,
+            delta=delta,
+            quantity_after=quantity_after,
+            created_at=now,
+        )
+    )
+    if kind not in _ROLLUP_KINDS:
+        return
+    consumed, restocked = (-delta, 0) if delta < 0 else (0, delta)
+    table = models.InventoryRollup.__table__
+    for period in ROLLUP_PERIODS:
+        db.execute(
+            sqlite_insert(table)
+            .values(
+                ingredient_id=item.ingredient_id,
+                period=period,
+                bucket_start=_bucket_start(now, period),
+                consumed=consumed,
+                restocked=restocked,
+                events=1,
+            )
+            .on_conflict_do_update(
+                index_elements=[table.c.ingredient_id, table.c.period, table.c.bucket_start],
+                set_={
+                    "consumed": table.c.consumed + consumed,
+                    "restocked": table.c.restocked + restocked,
+                    "events": table.c.events + 1,
+                },
+            )
+        )
+
+
+def list_inventory_events(
+    db: Session,
+    ingredient_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+):
+    q = db.query(models.InventoryEvent)
+    if ingredient_id is not None:
+        q = q.filter(models.InventoryEvent.ingredient_id == ingredient_id)
+    return q.order_by(models.InventoryEvent.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_consumption(
+    db: Session,
+    period: str = "day",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    ingredient_id: int | None = None,
+):
+    q = db.query(models.InventoryRollup).filter(models.InventoryRollup.period == period)
+    if since is not None:
+        q = q.filter(models.InventoryRollup.bucket_start >= _bucket_start(since, period))
+    if until is not None:
+        q = q.filter(models.InventoryRollup.bucket_start < until)
+    if ingredient_id is not None:
+        q = q.filter(models.InventoryRollup.ingredient_id == ingredient_id)
+    return q.order_by(
+        models.InventoryRollup.bucket_start, models.InventoryRollup.ingredient_id
+    ).all()
+
+
+def get_top_consumed(
+    db: Session,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 10,
+) -> list[dict]:
+    # Weekly rollups keep a year-long range to ~52 rows per ingredient; the
+    # bucket containing ``since`` is included whole.
+    rollup = models.InventoryRollup
+    consumed = func.sum(rollup.consumed)
+    q = (
+        db.query(rollup.ingredient_id, models.Ingredient.name, consumed, func.sum(rollup.restocked))
+        .outerjoin(models.Ingredient, models.Ingredient.id == rollup.ingredient_id)
+        .filter(rollup.period == "week")
+    )
+    if since is not None:
+        q = q.filter(rollup.bucket_start >= _bucket_start(since, "week"))
+    if until is not None:
+        q = q.filter(rollup.bucket_start < until)
+    rows = (
+        q.group_by(rollup.ingredient_id, models.Ingredient.name)
+        .order_by(consumed.desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {"ingredient_id": i, "name": name, "consumed": c or 0, "restocked": r or 0}
+        for i, name, c, r in rows
+    ]
+
+
+def get_report(db: Session, since: datetime | None = None, limit: int = 5) -> dict:
+    item = models.InventoryItem
+    return {
+        "recipes": db.query(func.count(models.Recipe.id)).scalar(),
+        "ingredients": db.query(func.count(models.Ingredient.id)).scalar(),
+        "inventory_items": db.query(func.count(item.id)).scalar(),
+        "out_of_stock": db.query(func.count(item.id))
+        .filter(func.coalesce(item.quantity, 0) <= 0)
+        .scalar(),
+        "top_consumed": get_top_consumed(db, since=since, limit=limit),
+    }
+
+
+def compact_inventory_events(
+    db: Session,
+    event_retention_days: int = 90,
+    hourly_retention_days: int = 30,
+) -> dict:
+    """Drop raw events and hourly rollups that day/week rollups already cover."""
+    now = datetime.utcnow()
+    events = (
+        db.query(models.InventoryEvent)
+        .filter(models.InventoryEvent.created_at < now - timedelta(days=event_retention_days))
+        .delete(synchronize_session=False)
+    )
+    hourly = (
+        db.query(models.InventoryRollup)
+        .filter(
+            models.InventoryRollup.period == "hour",
+            models.InventoryRollup.bucket_start < now - timedelta(days=hourly_retention_days),
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return {"events_deleted": events, "hourly_rollups_deleted": hourly}
+
+
 def get_suggestions(
     db: Session,
     limit: int = 20,
@@ -244,6 +679,12 @@ def get_suggestions(
 ) -> list[dict]:
     from sqlalchemy.orm import selectinload
 
+    from ..services import snapshot
+
+    snap = snapshot.current(db)
+    if snap is not None:
+        return snap.suggestions(db, limit=limit, max_missing=max_missing)
+
     inventory = (
         db.query(models.InventoryItem)
         .options(selectinload(models.InventoryItem.ingredient))
@@ -291,11 +732,23 @@ def get_suggestions_by_ingredients(
 ) -> list[dict]:
     from sqlalchemy.orm import selectinload
 
+    from ..services import snapshot
+
     selected_ings = (
         db.query(models.Ingredient)
         .filter(models.Ingredient.id.in_(ingredient_ids))
         .all()
     )
+
+    snap = snapshot.current(db)
+    if snap is not None:
+        # Unknown names map to -1 so "and" still fails while "or"/"not" ignore it.
+        selected_ids = {snap.canonical_id(ing.name) for ing in selected_ings}
+        selected_ids = {-1 if i is None else i for i in selected_ids}
+        return snap.suggestions_by_ingredients(
+            db, selected_ids, mode=mode, max_missing=max_missing, limit=limit
+        )
+
     selected_names = {synonyms.canonical_name(ing.name).lower() for ing in selected_ings}
 
     inventory = (
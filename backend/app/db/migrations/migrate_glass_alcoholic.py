@@ -1,25 +1,35 @@
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 from ..session import engine
 from .. import models
 
 
 def run() -> None:
-    """Populate Glass and Alcoholic tables based on existing recipe data."""
+    """Add Glass and Alcoholic lookups to recipes and backfill existing data."""
     models.Base.metadata.create_all(bind=engine)
+    columns = {c["name"] for c in inspect(engine).get_columns("recipes")}
+    with engine.begin() as conn:
+        for column in ("glass_id", "alcoholic_id"):
+            if column not in columns:
+                conn.execute(text(f"ALTER TABLE recipes ADD COLUMN {column} INTEGER"))
+
+    # Older databases kept the alcoholic flag as free text on the recipe row;
+    # glass information was never stored, so there is nothing to backfill.
+    if "alcoholic" not in columns:
+        return
     db = Session(bind=engine)
-    for recipe in db.query(models.Recipe).all():
-        if recipe.alcoholic:
-            alc = (
-                db.query(models.Alcoholic)
-                .filter(models.Alcoholic.name == recipe.alcoholic)
-                .first()
-            )
-            if not alc:
-                alc = models.Alcoholic(name=recipe.alcoholic)
-                db.add(alc)
-                db.flush()
-            recipe.alcoholic_id = alc.id
-        # existing DB does not store glass information
+    rows = db.execute(
+        text("SELECT id, alcoholic FROM recipes WHERE alcoholic IS NOT NULL")
+    ).all()
+    for recipe_id, name in rows:
+        alc = db.query(models.Alcoholic).filter(models.Alcoholic.name == name).first()
+        if not alc:
+            alc = models.Alcoholic(name=name)
+            db.add(alc)
+            db.flush()
+        db.query(models.Recipe).filter(models.Recipe.id == recipe_id).update(
+            {"alcoholic_id": alc.id}
+        )
     db.commit()
     db.close()
 
@@ -1,7 +1,21 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Integer, String
-from sqlalchemy.orm import declarative_base, relationship
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    Table,
+    event,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, declarative_base, relationship
 
 Base = declarative_base()
 
@@ -15,11 +29,70 @@ class Ingredient(Base):
     notes = Column(String, nullable=True)
 
 
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Glass(Base):
+    __tablename__ = "glasses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Alcoholic(Base):
+    __tablename__ = "alcoholics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Iba(Base):
+    __tablename__ = "ibas"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+recipe_tag = Table(
+    "recipe_tag",
+    Base.metadata,
+    Column("recipe_id", ForeignKey("recipes.id"), primary_key=True),
+    Column("tag_id", ForeignKey("tags.id"), primary_key=True),
+)
+
+recipe_category = Table(
+    "recipe_category",
+    Base.metadata,
+    Column("recipe_id", ForeignKey("recipes.id"), primary_key=True),
+    Column("category_id", ForeignKey("categories.id"), primary_key=True),
+)
+
+recipe_iba = Table(
+    "recipe_iba",
+    Base.metadata,
+    Column("recipe_id", ForeignKey("recipes.id"), primary_key=True),
+    Column("iba_id", ForeignKey("ibas.id"), primary_key=True),
+)
+
+
 class Recipe(Base):
     __tablename__ = "recipes"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
+    glass_id = Column(Integer, ForeignKey("glasses.id"), nullable=True)
+    alcoholic_id = Column(Integer, ForeignKey("alcoholics.id"), nullable=True)
     instructions = Column(String, nullable=True)
     thumb = Column(String, nullable=True)
 
@@ -28,6 +101,11 @@ class Recipe(Base):
         back_populates="recipe",
         cascade="all, delete-orphan",
     )
+    glass = relationship("Glass")
+    alcoholic = relationship("Alcoholic")
+    tags = relationship("Tag", secondary=recipe_tag)
+    categories = relationship("Category", secondary=recipe_category)
+    ibas = relationship("Iba", secondary=recipe_iba)
 
 
 class RecipeIngredient(Base):
@@ -50,3 +128,79 @@ class InventoryItem(Base):
     status = Column(String, default="available")
 
     ingredient = relationship("Ingredient")
+
+
+class InventoryEvent(Base):
+    __tablename__ = "inventory_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign key: events outlive the inventory item they describe.
+    inventory_item_id = Column(Integer, nullable=False)
+    ingredient_id = Column(Integer, nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
+    quantity_after = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class InventoryRollup(Base):
+    __tablename__ = "inventory_rollups"
+
+    ingredient_id = Column(Integer, primary_key=True)
+    period = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    consumed = Column(Integer, nullable=False, default=0)
+    restocked = Column(Integer, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, default="queued", index=True)
+    progress = Column(Float, default=0.0)
+    message = Column(String, nullable=True)
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# Derived caches (see services/snapshot.py) compare against these counters,
+# so they have to move on every write path, including ones that bypass
+# crud.py. Stock changes are counted separately because they are far more
+# frequent and only invalidate the cheap availability part of the caches.
+CATALOG_VERSION = 1
+INVENTORY_VERSION = 2
+
+_CATALOG_MODELS = (Ingredient, Recipe, RecipeIngredient)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_version(session, flush_context):
+    changed = list(chain(session.new, session.dirty, session.deleted))
+    keys = []
+    if any(isinstance(obj, _CATALOG_MODELS) for obj in changed):
+        keys.append(CATALOG_VERSION)
+    if any(isinstance(obj, InventoryItem) for obj in changed):
+        keys.append(INVENTORY_VERSION)
+    table = DataVersion.__table__
+    for key in keys:
+        session.connection().execute(
+            sqlite_insert(table)
+            .values(id=key, version=1)
+            .on_conflict_do_update(
+                index_elements=[table.c.id], set_={"version": table.c.version + 1}
+            )
+        )
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, List, Optional
 
 from pydantic import BaseModel
 
@@ -20,6 +21,14 @@ class Ingredient(IngredientBase):
         orm_mode = True
 
 
+class NamedItem(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        orm_mode = True
+
+
 class RecipeBase(BaseModel):
     name: str
     instructions: Optional[str] = None
@@ -44,11 +53,21 @@ class RecipeIngredient(RecipeIngredientBase):
 
 class RecipeCreate(RecipeBase):
     ingredients: List[RecipeIngredientCreate] = []
+    glass: Optional[str] = None
+    alcoholic: Optional[str] = None
+    tags: List[str] = []
+    categories: List[str] = []
+    ibas: List[str] = []
 
 
 class Recipe(RecipeBase):
     id: int
     ingredients: List[RecipeIngredient] = []
+    glass: Optional[NamedItem] = None
+    alcoholic: Optional[NamedItem] = None
+    tags: List[NamedItem] = []
+    categories: List[NamedItem] = []
+    ibas: List[NamedItem] = []
 
     class Config:
         orm_mode = True
@@ -89,6 +108,17 @@ class InventoryItemWithIngredient(InventoryItem):
     ingredient: Ingredient
 
 
+class FacetCount(BaseModel):
+    name: str
+    count: int
+
+
+class RecipeBrowse(BaseModel):
+    total: int
+    recipes: List[Recipe] = []
+    facets: dict[str, List[FacetCount]] = {}
+
+
 class RecipeSuggestion(BaseModel):
     id: int
     name: str
@@ -97,6 +127,97 @@ class RecipeSuggestion(BaseModel):
     available_count: int = 0
 
 
+class SimilarRecipe(BaseModel):
+    id: int
+    name: str
+    thumb: Optional[str] = None
+    similarity: float
+
+
 class Synonym(BaseModel):
     alias: str
     canonical: str
+
+
+class InventoryEvent(BaseModel):
+    id: int
+    inventory_item_id: int
+    ingredient_id: int
+    kind: str
+    delta: int
+    quantity_after: int
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ConsumptionBucket(BaseModel):
+    ingredient_id: int
+    bucket_start: datetime
+    consumed: int = 0
+    restocked: int = 0
+
+    class Config:
+        orm_mode = True
+
+
+class ConsumptionTotal(BaseModel):
+    ingredient_id: int
+    name: Optional[str] = None
+    consumed: int = 0
+    restocked: int = 0
+
+
+class InventoryImportItem(BaseModel):
+    name: str
+    quantity: int = 0
+
+
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict[str, Any] = {}
+
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: float = 0.0
+    message: Optional[str] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class VenueReport(BaseModel):
+    recipes: int
+    ingredients: int
+    inventory_items: int
+    out_of_stock: int
+    top_consumed: list[ConsumptionTotal] = []
+
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchRequestItem]
+
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: list[BatchResponseItem]
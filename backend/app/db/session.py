@@ -1,19 +1,124 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, Request
+from pathlib import Path
+from typing import Callable, TypeVar
 import os
+import re
+import threading
+
+T = TypeVar("T")
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///backend/data/seed.sqlite")
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Each venue other than the default gets its own SQLite file, engine and write
+# lock, so a busy bar never waits on another bar's writes. Venues are either
+# listed in VENUES or discovered from existing files in VENUES_DIR; unknown
+# names are rejected rather than silently creating a new database.
+DEFAULT_VENUE = "default"
+VENUES_DIR = Path(os.getenv("VENUES_DIR", "backend/data/venues"))
+VENUE_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+def _configured_venues() -> set[str]:
+    return {v.strip() for v in os.getenv("VENUES", "").split(",") if v.strip()}
+
+
+def _create_engine(url: str) -> Engine:
+    sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    # WAL lets a long read transaction (a /batch snapshot, an export) coexist
+    # with writers instead of blocking their commits.
+    @event.listens_for(sqlite_engine, "connect")
+    def _enable_wal(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    return sqlite_engine
+
+
+engine = _create_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_lock = threading.Lock()
+_sessionmakers: dict[str, sessionmaker] = {DEFAULT_VENUE: SessionLocal}
+
+
+def list_venues() -> list[str]:
+    found = {p.stem for p in VENUES_DIR.glob("*.sqlite")} if VENUES_DIR.is_dir() else set()
+    names = {v for v in found | _configured_venues() if VENUE_NAME.match(v)}
+    return [DEFAULT_VENUE, *sorted(names - {DEFAULT_VENUE})]
+
+
+def get_sessionmaker(venue: str) -> sessionmaker | None:
+    """Return the session factory for ``venue``, or ``None`` if it is unknown."""
+    with _lock:
+        factory = _sessionmakers.get(venue)
+    if factory is not None:
+        return factory
+    if venue not in list_venues():
+        return None
+
+    from .models import Base
 
-def get_db():
-    db = SessionLocal()
+    VENUES_DIR.mkdir(parents=True, exist_ok=True)
+    venue_engine = _create_engine(f"sqlite:///{VENUES_DIR / f'{venue}.sqlite'}")
+    Base.metadata.create_all(bind=venue_engine)
+    with _lock:
+        factory = _sessionmakers.setdefault(
+            venue, sessionmaker(autocommit=False, autoflush=False, bind=venue_engine)
+        )
+    return factory
+
+
+def get_engine(venue: str) -> Engine | None:
+    factory = get_sessionmaker(venue)
+    return factory.kw["bind"] if factory else None
+
+
+class ReadOnlySession(Exception):
+    """Raised when a handler tries to write through a read-only session."""
+
+
+# A /batch call lends one session to its sub-requests, marked with
+# ``db.info["read_only"]``; a commit or flush would end its snapshot.
+@event.listens_for(Session, "before_commit")
+def _reject_commit(db: Session) -> None:
+    if db.info.get("read_only"):
+        raise ReadOnlySession("Request writes and cannot run in a read-only session")
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_flush(db: Session, flush_context, instances) -> None:
+    if db.info.get("read_only"):
+        raise ReadOnlySession("Request writes and cannot run in a read-only session")
+
+
+def get_db(request: Request):
+    shared = getattr(request.state, "batch_session", None)
+    if shared is not None:
+        yield shared
+        return
+    venue = getattr(request.state, "venue", DEFAULT_VENUE)
+    factory = get_sessionmaker(venue)
+    if factory is None:
+        raise HTTPException(status_code=404, detail=f"Unknown venue: {venue}")
+    db = factory()
     try:
         yield db
     finally:
         db.close()
+
+
+def fan_out(fn: Callable[[Session], T]) -> dict[str, T]:
+    """Run ``fn`` against every venue in parallel, one session per venue."""
+    venues = list_venues()
+
+    def run(venue: str) -> T:
+        with get_sessionmaker(venue)() as db:
+            return fn(db)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(venues))) as pool:
+        return dict(zip(venues, pool.map(run, venues)))
@@ -1,12 +1,46 @@
 import logging
+import re
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from .api import ingredients, inventory, recipes, suggestions, synonyms
+from .api import (
+    admin,
+    batch,
+    categories,
+    ingredients,
+    inventory,
+    jobs,
+    recipes,
+    search,
+    stats,
+    suggestions,
+    synonyms,
+    tags,
+)
+from .db import models, session
+from .services import jobs as job_runner
+from .services import coalesce, facets, similarity, snapshot
+
+
+_VENUE_PREFIX = re.compile(r"^/venues/(?P<venue>[^/]+)(?P<rest>/.*)?$")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    models.Base.metadata.create_all(bind=session.engine)
+    for venue in session.list_venues():
+        engine = session.get_engine(venue)
+        job_runner.recover(engine)
+        snapshot.warm_start(engine)
+        facets.schedule(engine)
+        similarity.schedule(engine)
+    yield
+
 
-app = FastAPI(title="Bar Management")
+app = FastAPI(title="Bar Management", lifespan=lifespan)
 
 
 @app.middleware("http")
@@ -20,6 +54,19 @@ async def error_middleware(request: Request, call_next):
         return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
 
 
+@app.middleware("http")
+async def venue_middleware(request: Request, call_next):
+    """Select the venue from a ``/venues/{venue}`` prefix or ``X-Venue`` header."""
+    match = _VENUE_PREFIX.match(request.scope["path"])
+    if match:
+        venue = match["venue"]
+        request.scope["path"] = match["rest"] or "/"
+    else:
+        venue = request.headers.get("x-venue", session.DEFAULT_VENUE)
+    request.state.venue = venue.strip().lower()
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -34,6 +81,11 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return {"coalescing": coalesce.metrics()}
+
+
 @app.get("/")
 async def root():
     return {"message": "hello world"}
@@ -44,3 +96,10 @@ app.include_router(recipes.router, prefix="/recipes")
 app.include_router(inventory.router, prefix="/inventory")
 app.include_router(synonyms.router, prefix="/synonyms")
 app.include_router(suggestions.router, prefix="/suggestions")
+app.include_router(jobs.router, prefix="/jobs")
+app.include_router(stats.router, prefix="/stats")
+app.include_router(tags.router, prefix="/tags")
+app.include_router(categories.router, prefix="/categories")
+app.include_router(search.router, prefix="/search")
+app.include_router(admin.router, prefix="/admin")
+app.include_router(batch.router, prefix="/batch")
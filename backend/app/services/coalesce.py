@@ -0,0 +1,118 @@
+"""Single-flight coalescing for expensive read endpoints.
+
+When every tablet refreshes ``/suggestions`` at once, identical requests are
+queued on the threadpool and each repeats the same scan.  Requests with the
+same route, database, data versions and normalized parameters share one
+in-flight computation: the first caller runs it, later callers wait for its
+result.  The catalog and inventory versions and the synonyms fingerprint are
+part of the key, so a caller whose own write has committed never joins a
+computation that started before it.  Nothing is cached once the computation
+finishes.
+
+Only wrap functions returning plain data; ORM objects are bound to the
+leader's session and must not be handed to other threads.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable, TypeVar
+
+from sqlalchemy.orm import Session
+
+from ..db import crud, models
+from . import synonyms
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def do(self, route: str, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            stats = self._stats.setdefault(route, {"calls": 0, "executions": 0})
+            stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                stats["executions"] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as exc:
+                call.error = exc
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Per-route call counts and the share of calls served by another's run."""
+        with self._lock:
+            return {
+                route: {
+                    **stats,
+                    "coalesced": stats["calls"] - stats["executions"],
+                    "ratio": 1 - stats["executions"] / stats["calls"],
+                }
+                for route, stats in self._stats.items()
+            }
+
+
+_flight = SingleFlight()
+
+
+def _normalize(value: Any) -> Hashable:
+    # Multi-value query parameters have set semantics in the endpoints that
+    # use them, so [3, 1] and [1, 3] must share a computation.
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+def run(db: Session, route: str, fn: Callable[[], T], **params: Any) -> T:
+    """Run ``fn`` once for all concurrent calls with the same route and params.
+
+    Read-only sessions (``/batch``) run ``fn`` themselves: a shared result may
+    come from another session's snapshot.
+    """
+    if db.info.get("read_only"):
+        return fn()
+    engine = db.get_bind()
+    # A short-lived session returns its connection to the pool before this
+    # caller waits; followers holding connections would exhaust the pool.
+    with Session(bind=engine) as versions:
+        catalog = crud.get_data_version(versions, models.CATALOG_VERSION)
+        inventory = crud.get_data_version(versions, models.INVENTORY_VERSION)
+    key = (
+        route,
+        str(engine.url),
+        catalog,
+        inventory,
+        synonyms.fingerprint(),
+        tuple(sorted((k, _normalize(v)) for k, v in params.items())),
+    )
+    return _flight.do(route, key, fn)
+
+
+def metrics() -> dict[str, dict[str, float]]:
+    return _flight.metrics()
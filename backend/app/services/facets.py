@@ -0,0 +1,233 @@
+"""In-memory bitmap index for faceted recipe browsing.
+
+Each facet value (a tag, a glass, ...) owns a bitmap with one bit per recipe
+position, stored as a Python ``int``.  Filtering is a chain of AND/OR
+operations and every facet count is one intersection plus ``bit_count()``,
+so a refresh costs a few hundred big-int operations instead of one
+``COUNT`` query per facet value.
+
+The index is built per database by a ``rebuild-index`` background job (the
+first browse waits for it) and kept current by :func:`add_recipe` /
+:func:`remove_recipe`, which ``crud`` calls after a recipe is committed or
+deleted; see :mod:`.live_index`.  Positions of deleted recipes are left empty rather than reused.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterator
+
+from concurrent.futures import Future
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from ..db import models
+from .live_index import LiveIndexes
+
+FACETS = ("tag", "category", "glass", "alcoholic", "iba")
+
+
+def _facet_values(recipe: models.Recipe) -> dict[str, list[str]]:
+    return {
+        "tag": [t.name for t in recipe.tags],
+        "category": [c.name for c in recipe.categories],
+        "glass": [recipe.glass.name] if recipe.glass else [],
+        "alcoholic": [recipe.alcoholic.name] if recipe.alcoholic else [],
+        "iba": [i.name for i in recipe.ibas],
+    }
+
+
+def _iter_positions(bits: int) -> Iterator[int]:
+    # Scanning bytes avoids one full-width big-int op per set bit.
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield index * 8 + low.bit_length() - 1
+            byte ^= low
+
+
+def _to_bits(positions: Iterator[int], size: int) -> int:
+    data = bytearray((size + 7) // 8)
+    for pos in positions:
+        data[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(data, "little")
+
+
+class FacetIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recipe_ids: list[int | None] = []
+        self.names: list[str] = []
+        self.positions: dict[int, int] = {}
+        self.values: dict[int, dict[str, list[str]]] = {}
+        self.all_bits = 0
+        self.bitmaps: dict[str, dict[str, int]] = {f: {} for f in FACETS}
+
+    def build(self, db: Session) -> None:
+        recipes = db.query(models.Recipe).options(
+            selectinload(models.Recipe.tags),
+            selectinload(models.Recipe.categories),
+            selectinload(models.Recipe.ibas),
+            selectinload(models.Recipe.glass),
+            selectinload(models.Recipe.alcoholic),
+        )
+        for recipe in recipes.order_by(models.Recipe.id):
+            with self.lock:
+                self.add(recipe.id, recipe.name, _facet_values(recipe))
+
+    def add(self, recipe_id: int, name: str, values: dict[str, list[str]]) -> None:
+        if recipe_id in self.positions:
+            return
+        pos = len(self.recipe_ids)
+        bit = 1 << pos
+        self.recipe_ids.append(recipe_id)
+        self.names.append(name.lower())
+        self.positions[recipe_id] = pos
+        self.values[pos] = values
+        self.all_bits |= bit
+        for facet, names in values.items():
+            bitmaps = self.bitmaps[facet]
+            for value in names:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def remove(self, recipe_id: int) -> None:
+        pos = self.positions.pop(recipe_id, None)
+        if pos is None:
+            return
+        mask = ~(1 << pos)
+        self.recipe_ids[pos] = None
+        self.names[pos] = ""
+        self.all_bits &= mask
+        for facet, names in self.values.pop(pos).items():
+            bitmaps = self.bitmaps[facet]
+            for value in names:
+                bitmaps[value] &= mask
+                if not bitmaps[value]:
+                    del bitmaps[value]
+
+    def bits_for(self, recipe_ids) -> int:
+        positions = self.positions
+        return _to_bits((positions[r] for r in recipe_ids if r in positions), len(self.names))
+
+    def _base(self, q: str | None, allowed: int | None) -> int:
+        # The name scan is the costly part of a browse, so it runs once and
+        # every facet filter combination starts from its result.
+        bits = self.all_bits if allowed is None else self.all_bits & allowed
+        if q:
+            needle = q.strip().lower()
+            bits &= _to_bits(
+                (pos for pos, name in enumerate(self.names) if needle in name),
+                len(self.names),
+            )
+        return bits
+
+    def _match(
+        self, filters: dict[str, list[str]], base: int, exclude: str | None = None
+    ) -> int:
+        bits = base
+        for facet, wanted in filters.items():
+            if facet == exclude or not wanted:
+                continue
+            facet_bits = 0
+            for value in wanted:
+                facet_bits |= self.bitmaps[facet].get(value, 0)
+            bits &= facet_bits
+        return bits
+
+    def _ordered(self, matched: int, order: list[int]) -> Iterator[int]:
+        # Positions in ``order`` first, then any matched recipe it omits.
+        wanted = set(_iter_positions(matched))
+        positions = self.positions
+        for recipe_id in order:
+            pos = positions.get(recipe_id)
+            if pos in wanted:
+                wanted.discard(pos)
+                yield pos
+        yield from sorted(wanted)
+
+    def browse(
+        self,
+        filters: dict[str, list[str]],
+        q: str | None = None,
+        skip: int = 0,
+        limit: int = 50,
+        allowed: int | None = None,
+        order: list[int] | None = None,
+    ) -> tuple[list[int], int, dict[str, list[dict]]]:
+        """Return ``(page_ids, total, facet_counts)`` for the given filters.
+
+        Counts for a facet ignore that facet's own filter, so selecting one
+        tag still shows how many recipes the other tags would yield.
+        ``allowed`` restricts results and counts to a bitmap of positions;
+        ``order`` lists recipe ids to page through before the rest.
+        """
+        base = self._base(q, allowed)
+        matched = self._match(filters, base)
+        positions = _iter_positions(matched) if order is None else self._ordered(matched, order)
+        page: list[int] = []
+        for n, pos in enumerate(positions):
+            if n >= skip + limit:
+                break
+            if n >= skip:
+                page.append(self.recipe_ids[pos])
+
+        counts: dict[str, list[dict]] = {}
+        for facet in FACETS:
+            facet_base = (
+                self._match(filters, base, exclude=facet) if filters.get(facet) else matched
+            )
+            facet_counts = [
+                {"name": value, "count": (bitmap & facet_base).bit_count()}
+                for value, bitmap in self.bitmaps[facet].items()
+            ]
+            counts[facet] = sorted(
+                (c for c in facet_counts if c["count"]),
+                key=lambda c: (-c["count"], c["name"]),
+            )
+        return page, matched.bit_count(), counts
+
+
+_indexes: LiveIndexes[FacetIndex] = LiveIndexes("facets", FacetIndex)
+
+
+def schedule(engine: Engine) -> Future:
+    return _indexes.schedule(engine)
+
+
+def rebuild(db: Session) -> int:
+    """Build a fresh index for ``db``'s database and swap it in."""
+    return len(_indexes.rebuild(db).positions)
+
+
+def get_index(db: Session) -> FacetIndex:
+    return _indexes.get(db)
+
+
+def browse(
+    db: Session,
+    filters: dict[str, list[str]],
+    q: str | None = None,
+    skip: int = 0,
+    limit: int = 50,
+    available: set[int] | None = None,
+    order: list[int] | None = None,
+) -> tuple[list[int], int, dict[str, list[dict]]]:
+    """Browse the index; ``available`` limits results to those recipe ids."""
+    index = get_index(db)
+    with index.lock:
+        allowed = None if available is None else index.bits_for(available)
+        return index.browse(
+            filters, q=q, skip=skip, limit=limit, allowed=allowed, order=order
+        )
+
+
+def add_recipe(db: Session, recipe: models.Recipe) -> None:
+    """Add a committed recipe to the live and any in-progress index."""
+    values = _facet_values(recipe)
+    _indexes.apply(db, lambda index: index.add(recipe.id, recipe.name, values))
+
+
+def remove_recipe(db: Session, recipe_id: int) -> None:
+    _indexes.apply(db, lambda index: index.remove(recipe_id))
@@ -0,0 +1,324 @@
+"""Background job runner for heavy maintenance operations.
+
+Jobs are persisted in the ``jobs`` table so status survives the request that
+submitted them.  Write jobs run on a single worker thread per database, which
+guarantees at most one of them touches a venue at a time without making
+venues wait on each other; read-only jobs (exports, index rebuilds) share a
+small pool.  Cancellation is cooperative: handlers report progress through
+:class:`JobContext`, which raises :class:`JobCancelled` once a cancel has
+been requested.
+
+Progress is kept in memory while a job runs and written with its final
+status.  A handler usually holds SQLite's write lock between flushes, so a
+progress row written through a second session would wait on it and time out.
+
+Derived indexes (snapshot, facets, similarity) rebuild through
+:func:`ensure`, which queues at most one pending rebuild per database.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+from pydantic import BaseModel, RootModel
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..db import crud, models, schemas
+from . import facets, similarity, snapshot, synonyms
+
+_read_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="job-read")
+
+_lock = threading.Lock()
+_write_pools: dict[str, ThreadPoolExecutor] = {}
+_running: set[int] = set()
+_cancel_requested: set[int] = set()
+_live_progress: dict[int, tuple[float, str | None]] = {}
+_pending: dict[tuple[str, str, str], Future] = {}
+
+FINISHED = {"succeeded", "failed", "cancelled"}
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled."""
+
+
+class JobContext:
+    def __init__(self, engine: Engine, job_id: int):
+        self.engine = engine
+        self.job_id = job_id
+
+    def check_cancelled(self) -> None:
+        with _lock:
+            if self.job_id in _cancel_requested:
+                raise JobCancelled()
+
+    def progress(self, done: int, total: int, message: str | None = None) -> None:
+        """Record progress and abort if the job was cancelled."""
+        self.check_cancelled()
+        with _lock:
+            _live_progress[self.job_id] = (done / total if total else 1.0, message)
+
+
+@dataclass(frozen=True)
+class JobType:
+    handler: Callable[[Session, JobContext, Any], dict | None]
+    writes: bool
+    payload_model: type[BaseModel] | None = None
+
+
+class _SynonymMapping(RootModel[dict[str, str]]):
+    pass
+
+
+class _InventoryImport(BaseModel):
+    items: list[schemas.InventoryImportItem]
+
+
+class _Compaction(BaseModel):
+    event_retention_days: int = 90
+    hourly_retention_days: int = 30
+
+
+class _Rebuild(BaseModel):
+    # ``None`` rebuilds every index.
+    index: Literal["snapshot", "facets", "similarity"] | None = None
+
+
+def _aggregate_synonyms(db: Session, ctx: JobContext, payload: None) -> None:
+    crud.aggregate_inventory_by_synonyms(db, progress=ctx.progress)
+
+
+def _import_synonyms(db: Session, ctx: JobContext, payload: _SynonymMapping) -> dict:
+    synonyms.import_synonyms(payload.root)
+    return {"imported": len(payload.root)}
+
+
+def _import_inventory(db: Session, ctx: JobContext, payload: _InventoryImport) -> dict:
+    return {"imported": crud.import_inventory_items(db, payload.items, progress=ctx.progress)}
+
+
+def _compact_events(db: Session, ctx: JobContext, payload: _Compaction) -> dict:
+    return crud.compact_inventory_events(db, **payload.model_dump())
+
+
+def _rebuild_index(db: Session, ctx: JobContext, payload: _Rebuild) -> dict:
+    result = {}
+    if payload.index in (None, "snapshot"):
+        path = snapshot.snapshot_path(ctx.engine)
+        if path is not None:
+            snap = snapshot.build(db, path)
+            result["snapshot"] = {
+                "recipes": len(snap),
+                "catalog_version": snap.catalog_version,
+            }
+    if payload.index in (None, "facets"):
+        result["facets"] = {"recipes": facets.rebuild(db)}
+    if payload.index in (None, "similarity"):
+        result["similarity"] = {"recipes": similarity.rebuild(db)}
+    return result
+
+
+def _export(db: Session, ctx: JobContext, payload: None) -> dict:
+    data = crud.export_data(db, progress=ctx.progress)
+    database = ctx.engine.url.database
+    on_disk = database and database != ":memory:"
+    directory = Path(database).parent if on_disk else Path(".")
+    # Venue databases share a directory and each numbers its jobs from 1.
+    name = Path(database).stem if on_disk else "memory"
+    path = directory / "exports" / f"export-{name}-{ctx.job_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+    return {"path": str(path), **{k: len(v) for k, v in data.items()}}
+
+
+JOB_TYPES: dict[str, JobType] = {
+    "aggregate-synonyms": JobType(_aggregate_synonyms, writes=True),
+    "import-synonyms": JobType(_import_synonyms, writes=True, payload_model=_SynonymMapping),
+    "import-inventory": JobType(_import_inventory, writes=True, payload_model=_InventoryImport),
+    "compact-events": JobType(_compact_events, writes=True, payload_model=_Compaction),
+    "rebuild-index": JobType(_rebuild_index, writes=False, payload_model=_Rebuild),
+    "export": JobType(_export, writes=False),
+}
+
+
+def _update(engine: Engine, job_id: int, only_if: str | None = None, **fields) -> int:
+    """Update a job row, optionally only while it has status ``only_if``."""
+    with Session(bind=engine) as db:
+        q = db.query(models.Job).filter(models.Job.id == job_id)
+        if only_if is not None:
+            q = q.filter(models.Job.status == only_if)
+        count = q.update(fields, synchronize_session=False)
+        db.commit()
+        return count
+
+
+def _run(engine: Engine, job_id: int, job_type: JobType, payload: Any) -> str:
+    # Register before leaving "queued" so a cancel that loses the race to
+    # the update below still finds the job and flags it.
+    with _lock:
+        _running.add(job_id)
+    if not _update(
+        engine, job_id, only_if="queued", status="running", started_at=datetime.utcnow()
+    ):
+        with _lock:
+            _running.discard(job_id)
+        return "cancelled"
+    ctx = JobContext(engine, job_id)
+    with Session(bind=engine) as db:
+        try:
+            result = job_type.handler(db, ctx, payload)
+        except JobCancelled:
+            db.rollback()
+            fields = {"status": "cancelled"}
+        except Exception as exc:
+            logging.exception("Job %s failed", job_id)
+            db.rollback()
+            fields = {"status": "failed", "error": str(exc)}
+        else:
+            fields = {"status": "succeeded", "progress": 1.0, "result": result}
+    with _lock:
+        _running.discard(job_id)
+        _cancel_requested.discard(job_id)
+        live = _live_progress.pop(job_id, None)
+    if live is not None:
+        fields.setdefault("progress", live[0])
+        fields["message"] = live[1]
+    _update(engine, job_id, finished_at=datetime.utcnow(), **fields)
+    return fields["status"]
+
+
+def _write_pool(engine: Engine) -> ThreadPoolExecutor:
+    with _lock:
+        key = str(engine.url)
+        if key not in _write_pools:
+            _write_pools[key] = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="job-write"
+            )
+        return _write_pools[key]
+
+
+def _parse(job_type: JobType, payload: dict | None) -> Any:
+    if job_type.payload_model is None:
+        return None
+    return job_type.payload_model.model_validate(payload or {})
+
+
+def _create(db: Session, kind: str, payload: dict | None) -> models.Job:
+    job = models.Job(kind=kind, status="queued", progress=0.0, payload=payload or None)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def submit(db: Session, kind: str, payload: dict | None = None) -> models.Job:
+    """Persist a job and queue it. Raises ``KeyError``/``ValueError`` on bad input."""
+    job_type = JOB_TYPES[kind]
+    parsed = _parse(job_type, payload)
+    job = _create(db, kind, payload)
+    engine = db.get_bind()
+    pool = _write_pool(engine) if job_type.writes else _read_pool
+    pool.submit(_run, engine, job.id, job_type, parsed)
+    return job
+
+
+def _create_and_run(engine: Engine, kind: str, payload: dict | None, parsed: Any) -> str:
+    with Session(bind=engine) as db:
+        job_id = _create(db, kind, payload).id
+    return _run(engine, job_id, JOB_TYPES[kind], parsed)
+
+
+def ensure(
+    engine: Engine, kind: str, payload: dict | None = None, fresh: bool = False
+) -> Future:
+    """Queue a read-only job unless an identical one is still pending.
+
+    Meant for rebuilds triggered from request handlers: the job row is
+    written on the worker thread, so the caller never waits on the database
+    write lock.  The returned future resolves to the job's final status.
+    With ``fresh``, an identical job that has already started does not count,
+    as it may have read the data before the caller's change.
+    """
+    job_type = JOB_TYPES[kind]
+    parsed = _parse(job_type, payload)
+    key = (str(engine.url), kind, json.dumps(payload, sort_keys=True))
+    with _lock:
+        future = _pending.get(key)
+        if future is None or future.done() or (fresh and future.running()):
+            future = _read_pool.submit(_create_and_run, engine, kind, payload, parsed)
+            _pending[key] = future
+        return future
+
+
+def _with_live_progress(job: models.Job | None) -> models.Job | None:
+    if job is None or job.status != "running":
+        return job
+    with _lock:
+        live = _live_progress.get(job.id)
+    if live is not None:
+        # Committed values keep the session clean; these are not to be saved.
+        set_committed_value(job, "progress", live[0])
+        set_committed_value(job, "message", live[1])
+    return job
+
+
+def get_job(db: Session, job_id: int):
+    return _with_live_progress(db.query(models.Job).filter(models.Job.id == job_id).first())
+
+
+def list_jobs(db: Session, skip: int = 0, limit: int = 100, status: str | None = None):
+    q = db.query(models.Job)
+    if status:
+        q = q.filter(models.Job.status == status)
+    jobs = q.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
+    return [_with_live_progress(job) for job in jobs]
+
+
+def cancel(db: Session, job_id: int):
+    """Request cancellation; queued jobs are cancelled immediately.
+
+    A job that has already started stops at its next progress report, and
+    keeps its status until then.  Handlers that never report run to the end.
+    """
+    job = get_job(db, job_id)
+    if not job or job.status in FINISHED:
+        return job
+    # Conditional, because the worker may have started the job since it was read.
+    cancelled = (
+        db.query(models.Job)
+        .filter(models.Job.id == job_id, models.Job.status == "queued")
+        .update(
+            {"status": "cancelled", "finished_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not cancelled:
+        with _lock:
+            if job_id in _running:
+                _cancel_requested.add(job_id)
+    db.refresh(job)
+    return _with_live_progress(job)
+
+
+def recover(engine: Engine) -> None:
+    """Fail jobs left queued or running by a previous process."""
+    with Session(bind=engine) as db:
+        db.query(models.Job).filter(models.Job.status.in_(["queued", "running"])).update(
+            {
+                "status": "failed",
+                "error": "Interrupted by restart",
+                "finished_at": datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
@@ -0,0 +1,96 @@
+"""Lifecycle shared by the in-memory recipe indexes (facets, similarity).
+
+Each database gets its own index, built from scratch by a ``rebuild-index``
+job and swapped in when complete.  While a build runs, ``crud`` changes are
+applied to both the live index and the one being built, so nothing committed
+after the build's query started is lost.  A change committed just before
+that, or a delete the build's query still saw, can still slip through, so
+the catalog version is compared after the swap and another rebuild is queued
+if it moved.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Generic, Protocol, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+
+class _Index(Protocol):
+    lock: threading.Lock
+
+    def build(self, db: Session) -> None: ...
+
+
+I = TypeVar("I", bound=_Index)
+
+
+def _key(db: Session) -> str:
+    return str(db.get_bind().url)
+
+
+class LiveIndexes(Generic[I]):
+    """Per-database live index plus the one a running job is building."""
+
+    def __init__(self, name: str, factory: Callable[[], I]):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._live: dict[str, I] = {}
+        self._building: dict[str, I] = {}
+
+    def schedule(self, engine: Engine, fresh: bool = False) -> Future:
+        from . import jobs
+
+        return jobs.ensure(engine, "rebuild-index", {"index": self.name}, fresh=fresh)
+
+    def rebuild(self, db: Session) -> I:
+        """Build a fresh index for ``db``'s database and swap it in."""
+        from ..db import crud
+
+        key = _key(db)
+        index = self._factory()
+        with self._lock:
+            self._building[key] = index
+        try:
+            # Read after registering: a later commit either reaches the new
+            # index through apply() or shows up as a version change below.
+            version = crud.get_data_version(db)
+            index.build(db)
+        finally:
+            with self._lock:
+                if self._building.get(key) is index:
+                    del self._building[key]
+        with self._lock:
+            self._live[key] = index
+        # A fresh session, in case ``db`` still holds the build's snapshot.
+        with Session(bind=db.get_bind()) as current:
+            if crud.get_data_version(current) != version:
+                self.schedule(db.get_bind(), fresh=True)
+        return index
+
+    def peek(self, db: Session) -> I | None:
+        with self._lock:
+            return self._live.get(_key(db))
+
+    def get(self, db: Session) -> I:
+        """Return the live index, waiting for the first build if needed."""
+        index = self.peek(db)
+        if index is None:
+            self.schedule(db.get_bind()).result()
+            index = self.peek(db)
+            if index is None:
+                raise RuntimeError(f"{self.name.title()} index could not be built")
+        return index
+
+    def apply(self, db: Session, change: Callable[[I], None]) -> None:
+        """Apply a committed change to the live and any in-progress index."""
+        key = _key(db)
+        with self._lock:
+            targets = (self._live.get(key), self._building.get(key))
+        for index in (i for i in targets if i is not None):
+            with index.lock:
+                change(index)
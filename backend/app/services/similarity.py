@@ -0,0 +1,185 @@
+"""MinHash/LSH index answering "recipes like this one".
+
+Each recipe is reduced to the set of its canonical ingredient names and a
+MinHash signature of ``NUM_BANDS * ROWS_PER_BAND`` values.  The signature is
+split into bands; recipes sharing any band hash land in the same bucket and
+become candidates, which are then ranked by exact Jaccard similarity.
+
+Cocktails have four to six ingredients, so interesting neighbours often
+share only a third of them.  Two rows per band keeps the detection threshold
+near J=0.25 (about 84% recall at J=0.33) at the cost of larger buckets.
+
+Like the facet index, this is built per database by a ``rebuild-index``
+background job and kept current from ``crud.create_recipe``/
+``crud.delete_recipe``.  A change to the synonym mapping alters canonical
+names, so it triggers a full rebuild; until that job swaps the new index in,
+lookups keep using the previous one (a rebuild takes seconds at 100k).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import threading
+from array import array
+from concurrent.futures import Future
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from ..db import models
+from . import synonyms
+from .live_index import LiveIndexes
+
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+# Buckets keyed by two very common ingredients (vodka + lime) grow into the
+# thousands and carry little signal; scanning them dominated lookups at 100k
+# recipes, so they are skipped unless every band is that crowded.
+MAX_BUCKET_SCAN = 2000
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_BANDS * ROWS_PER_BAND)
+]
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+
+
+def minhash(tokens: frozenset[str]) -> list[int]:
+    hashes = [_token_hash(t) for t in tokens] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature: list[int]) -> array:
+    # Python's tuple-of-int hash is not salted, so keys are stable across runs.
+    return array(
+        "q",
+        (
+            hash((band, *signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]))
+            for band in range(NUM_BANDS)
+        ),
+    )
+
+
+def recipe_tokens(recipe: models.Recipe) -> frozenset[str]:
+    return frozenset(synonyms.canonical_name(i.name).lower() for i in recipe.ingredients)
+
+
+class SimilarityIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.synonyms_fingerprint: int | None = None
+        self.tokens: dict[int, frozenset[str]] = {}
+        self.keys: dict[int, array] = {}
+        self.buckets: list[dict[int, set[int]]] = [{} for _ in range(NUM_BANDS)]
+
+    def build(self, db: Session) -> None:
+        self.synonyms_fingerprint = synonyms.fingerprint()
+        recipes = db.query(models.Recipe).options(selectinload(models.Recipe.ingredients))
+        for recipe in recipes:
+            tokens = recipe_tokens(recipe)
+            with self.lock:
+                self.add(recipe.id, tokens)
+
+    def add(self, recipe_id: int, tokens: frozenset[str]) -> None:
+        if recipe_id in self.tokens:
+            self.remove(recipe_id)
+        keys = band_keys(minhash(tokens))
+        self.tokens[recipe_id] = tokens
+        self.keys[recipe_id] = keys
+        for band, key in enumerate(keys):
+            self.buckets[band].setdefault(key, set()).add(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        keys = self.keys.pop(recipe_id, None)
+        self.tokens.pop(recipe_id, None)
+        if keys is None:
+            return
+        for band, key in enumerate(keys):
+            bucket = self.buckets[band].get(key)
+            if bucket is None:
+                continue
+            bucket.discard(recipe_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+    def similar(
+        self,
+        recipe_id: int,
+        limit: int = 10,
+        available: set[str] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return ``(recipe_id, jaccard)`` pairs, best first.
+
+        With ``available`` set, only recipes fully makeable from it are kept.
+        """
+        tokens = self.tokens.get(recipe_id)
+        if not tokens:
+            return []
+        buckets = [
+            self.buckets[band].get(key, set())
+            for band, key in enumerate(self.keys[recipe_id])
+        ]
+        usable = [b for b in buckets if len(b) <= MAX_BUCKET_SCAN]
+        candidates: set[int] = set().union(*(usable or [min(buckets, key=len)]))
+        candidates.discard(recipe_id)
+
+        scored = []
+        for other in candidates:
+            other_tokens = self.tokens[other]
+            if available is not None and not other_tokens <= available:
+                continue
+            score = len(tokens & other_tokens) / len(tokens | other_tokens)
+            if score:
+                scored.append((other, score))
+        scored.sort(key=lambda s: (-s[1], s[0]))
+        return scored[:limit]
+
+
+_indexes: LiveIndexes[SimilarityIndex] = LiveIndexes("similarity", SimilarityIndex)
+
+
+def schedule(engine: Engine) -> Future:
+    return _indexes.schedule(engine)
+
+
+def rebuild(db: Session) -> int:
+    """Build a fresh index for ``db``'s database and swap it in."""
+    return len(_indexes.rebuild(db).tokens)
+
+
+def get_index(db: Session) -> SimilarityIndex:
+    """Return the live index, waiting only when none has been built yet."""
+    index = _indexes.get(db)
+    if index.synonyms_fingerprint != synonyms.fingerprint():
+        schedule(db.get_bind())
+    return index
+
+
+def similar(
+    db: Session,
+    recipe: models.Recipe,
+    limit: int = 10,
+    available: set[str] | None = None,
+) -> list[tuple[int, float]]:
+    index = get_index(db)
+    with index.lock:
+        # Recipes written by another process are picked up on first lookup.
+        if recipe.id not in index.tokens:
+            index.add(recipe.id, recipe_tokens(recipe))
+        return index.similar(recipe.id, limit=limit, available=available)
+
+
+def add_recipe(db: Session, recipe: models.Recipe) -> None:
+    """Add a committed recipe to the live and any in-progress index."""
+    tokens = recipe_tokens(recipe)
+    _indexes.apply(db, lambda index: index.add(recipe.id, tokens))
+
+
+def remove_recipe(db: Session, recipe_id: int) -> None:
+    _indexes.apply(db, lambda index: index.remove(recipe_id))
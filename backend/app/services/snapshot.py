@@ -0,0 +1,360 @@
+"""Persisted snapshot of derived lookup structures for fast warm starts.
+
+Canonicalising every recipe ingredient is the bulk of a ``/suggestions``
+request and, after a restart, nothing of it is cached.  The snapshot stores
+the canonical-name mapping, the recipe/ingredient matrix (CSR layout) and the
+in-stock set in one binary file next to the SQLite database.  Integer arrays
+are read straight out of a memory map; only the string table is decoded.
+
+A snapshot is only used while its catalog version and synonyms fingerprint
+match the live values.  Stale snapshots are rebuilt by a ``rebuild-index``
+background job and callers fall back to the regular query path in the meantime.  Stock changes
+do not invalidate the file: availability is re-read with one query and the
+per-recipe counts are recomputed in memory once per inventory version.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from pathlib import Path
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload
+
+from ..db import models
+from . import synonyms
+
+# magic, format, catalog version, inventory version, synonyms fingerprint,
+# n_names, n_aliases, n_recipes, n_entries, n_available
+_HEADER = struct.Struct("<8sIqqqIIIII")
+_MAGIC = b"BARSNAP\x00"
+_FORMAT = 2
+_SEP = "\x00"
+
+_lock = threading.Lock()
+_loaded: dict[Path, "Snapshot"] = {}
+
+
+class Snapshot:
+    """Read-only view over a memory-mapped snapshot file.
+
+    Recipes are stored sorted by name, so ranking by ``(missing_count, name)``
+    is a counting sort on the missing count rather than a full sort.
+    """
+
+    def __init__(self, path: Path, buf: mmap.mmap | bytes):
+        self.path = path
+        self._buf = buf
+        self._lock = threading.Lock()
+        self._ranking: tuple[int, frozenset[int], list[int], list[int]] | None = None
+        (
+            magic,
+            fmt,
+            self.catalog_version,
+            self.inventory_version,
+            self.synonyms_fingerprint,
+            n_names,
+            n_aliases,
+            n_recipes,
+            n_entries,
+            n_available,
+        ) = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or fmt != _FORMAT:
+            raise ValueError(f"{path} is not a snapshot file")
+
+        view = memoryview(buf)
+        offset = _HEADER.size
+
+        def ints(count: int):
+            nonlocal offset
+            chunk = view[offset : offset + 4 * count]
+            offset += 4 * count
+            return _as_int32(chunk)
+
+        alias_targets = ints(n_aliases)
+        self.recipe_ids = ints(n_recipes)
+        self.offsets = ints(n_recipes + 1)
+        self.entries = ints(n_entries)
+        self.stored_available = frozenset(ints(n_available))
+
+        strings = bytes(view[offset:]).decode("utf-8").split(_SEP)
+        self.names = strings[:n_names]
+        aliases = strings[n_names : n_names + n_aliases]
+        rest = strings[n_names + n_aliases :]
+        self.recipe_names = rest[:n_recipes]
+        self.recipe_thumbs = [t or None for t in rest[n_recipes : 2 * n_recipes]]
+        self._alias_index = dict(zip(aliases, alias_targets))
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def is_fresh(self, catalog_version: int) -> bool:
+        return (
+            self.catalog_version == catalog_version
+            and self.synonyms_fingerprint == synonyms.fingerprint()
+        )
+
+    def canonical_id(self, name: str) -> int | None:
+        """Return the canonical ingredient id for a raw name, if known."""
+        return self._alias_index.get(name.strip().lower())
+
+    def _available_ids(self, db: Session) -> frozenset[int]:
+        names = (
+            db.query(models.Ingredient.name)
+            .join(models.InventoryItem, models.InventoryItem.ingredient_id == models.Ingredient.id)
+            .filter(models.InventoryItem.quantity > 0)
+        )
+        # Names missing from the alias index occur in no recipe, so they can
+        # never change a count.
+        ids = (self.canonical_id(name) for (name,) in names)
+        return frozenset(i for i in ids if i is not None)
+
+    def ranking(self, db: Session) -> tuple[frozenset[int], list[int], list[int]]:
+        """Return ``(available, avail_counts, order)`` for the live inventory.
+
+        ``order`` lists recipe positions by ``(missing_count, name)``.  The
+        result is cached until the inventory version moves.
+        """
+        from ..db import crud
+
+        version = crud.get_data_version(db, models.INVENTORY_VERSION)
+        with self._lock:
+            cached = self._ranking
+        if cached is not None and cached[0] == version:
+            return cached[1:]
+
+        if version == self.inventory_version:
+            available = self.stored_available
+        else:
+            available = self._available_ids(db)
+        offsets, entries = self.offsets, self.entries
+        counts = []
+        buckets: dict[int, list[int]] = {}
+        for pos in range(len(self)):
+            start, end = offsets[pos], offsets[pos + 1]
+            count = sum(1 for i in entries[start:end] if i in available)
+            counts.append(count)
+            if start != end:
+                buckets.setdefault(end - start - count, []).append(pos)
+        order = [pos for missing in sorted(buckets) for pos in buckets[missing]]
+        with self._lock:
+            self._ranking = (version, available, counts, order)
+        return available, counts, order
+
+    def _row(self, pos: int, missing: int, available: int) -> dict:
+        return {
+            "id": self.recipe_ids[pos],
+            "name": self.recipe_names[pos],
+            "thumb": self.recipe_thumbs[pos],
+            "missing_count": missing,
+            "available_count": available,
+        }
+
+    def suggestions(
+        self, db: Session, limit: int = 20, max_missing: int | None = None
+    ) -> list[dict]:
+        _, counts, order = self.ranking(db)
+        results = []
+        for pos in order:
+            total = self.offsets[pos + 1] - self.offsets[pos]
+            avail_count = counts[pos]
+            missing = total - avail_count
+            if max_missing is not None and missing > max_missing:
+                continue
+            results.append(self._row(pos, missing, avail_count))
+            if len(results) >= limit:
+                break
+        return results
+
+    def suggestions_by_ingredients(
+        self,
+        db: Session,
+        selected: set[int],
+        mode: str = "and",
+        max_missing: int = 3,
+        limit: int = 50,
+    ) -> list[dict]:
+        available, _, _ = self.ranking(db)
+        results = []
+        for pos in range(len(self)):
+            start, end = self.offsets[pos], self.offsets[pos + 1]
+            if start == end:
+                continue
+            recipe_ids = set(self.entries[start:end])
+
+            if selected:
+                if mode == "and" and not selected.issubset(recipe_ids):
+                    continue
+                elif mode == "or" and not (selected & recipe_ids):
+                    continue
+                elif mode == "not" and (selected & recipe_ids):
+                    continue
+
+            avail_count = len(recipe_ids & available)
+            missing = (end - start) - avail_count
+            if missing > max_missing:
+                continue
+            results.append(self._row(pos, missing, avail_count))
+
+        results.sort(key=lambda r: (r["missing_count"], r["name"]))
+        return results[:limit]
+
+
+def _as_int32(chunk: memoryview):
+    if sys.byteorder == "little":
+        return chunk.cast("i")
+    values = array("i", chunk)
+    values.byteswap()
+    return values
+
+
+def _pack_int32(values: list[int]) -> bytes:
+    data = array("i", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def snapshot_path(engine: Engine) -> Path | None:
+    """Return the snapshot location for ``engine`` or ``None`` if unsupported."""
+    database = engine.url.database
+    if engine.url.get_backend_name() != "sqlite" or not database or database == ":memory:":
+        return None
+    return Path(database).with_suffix(".snapshot")
+
+
+def build(db: Session, path: Path) -> Snapshot:
+    """Compute derived structures from the database and write them to ``path``."""
+    from ..db import crud
+
+    # Read versions first: writes racing with the build bump them past the
+    # stored values, which only makes the snapshot look stale, never wrong.
+    catalog_version = crud.get_data_version(db, models.CATALOG_VERSION)
+    inventory_version = crud.get_data_version(db, models.INVENTORY_VERSION)
+    fingerprint = synonyms.fingerprint()
+
+    names: list[str] = []
+    name_ids: dict[str, int] = {}
+    aliases: dict[str, int] = {}
+
+    def canonical_id(raw: str) -> int:
+        key = raw.strip().lower()
+        if key not in aliases:
+            canonical = synonyms.canonical_name(raw).lower()
+            if canonical not in name_ids:
+                name_ids[canonical] = len(names)
+                names.append(canonical)
+            aliases[key] = name_ids[canonical]
+        return aliases[key]
+
+    for ing in db.query(models.Ingredient).all():
+        canonical_id(ing.name)
+
+    inventory = (
+        db.query(models.InventoryItem)
+        .options(selectinload(models.InventoryItem.ingredient))
+        .filter(models.InventoryItem.quantity > 0)
+        .all()
+    )
+    available = {canonical_id(item.ingredient.name) for item in inventory}
+
+    rows = [
+        (recipe, [canonical_id(i.name) for i in recipe.ingredients])
+        for recipe in db.query(models.Recipe).options(selectinload(models.Recipe.ingredients))
+    ]
+    rows.sort(key=lambda r: r[0].name)
+
+    offsets = [0]
+    entries: list[int] = []
+    for _, ids in rows:
+        entries.extend(ids)
+        offsets.append(len(entries))
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _FORMAT,
+        catalog_version,
+        inventory_version,
+        fingerprint,
+        len(names),
+        len(aliases),
+        len(rows),
+        len(entries),
+        len(available),
+    )
+    strings = _SEP.join(
+        names
+        + list(aliases)
+        + [r[0].name for r in rows]
+        + [r[0].thumb or "" for r in rows]
+    )
+    # Unique temp name: the background rebuild and a rebuild job may race.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(_pack_int32(list(aliases.values())))
+        f.write(_pack_int32([r[0].id for r in rows]))
+        f.write(_pack_int32(offsets))
+        f.write(_pack_int32(entries))
+        f.write(_pack_int32(sorted(available)))
+        f.write(strings.encode("utf-8"))
+    os.replace(tmp, path)
+    return load(path)
+
+
+def load(path: Path) -> Snapshot | None:
+    """Memory-map ``path``; return ``None`` if it is missing or unreadable."""
+    try:
+        with path.open("rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        snap = Snapshot(path, buf)
+    except (OSError, ValueError, struct.error):
+        return None
+    with _lock:
+        _loaded[path] = snap
+    return snap
+
+
+def schedule_rebuild(engine: Engine) -> None:
+    """Queue a snapshot rebuild job unless one is already pending."""
+    from . import jobs
+
+    if snapshot_path(engine) is not None:
+        jobs.ensure(engine, "rebuild-index", {"index": "snapshot"})
+
+
+def current(db: Session) -> Snapshot | None:
+    """Return a snapshot matching the live data, or ``None`` if none is ready.
+
+    A stale or missing snapshot triggers a background rebuild.
+    """
+    from ..db import crud
+
+    engine = db.get_bind()
+    path = snapshot_path(engine)
+    if path is None:
+        return None
+    with _lock:
+        snap = _loaded.get(path)
+    if snap is None:
+        snap = load(path)
+    if snap is not None and snap.is_fresh(
+        crud.get_data_version(db, models.CATALOG_VERSION)
+    ):
+        return snap
+    schedule_rebuild(engine)
+    return None
+
+
+def warm_start(engine: Engine) -> Snapshot | None:
+    """Load the on-disk snapshot at startup, scheduling a rebuild if stale."""
+    if snapshot_path(engine) is None:
+        return None
+    with Session(bind=engine) as db:
+        return current(db)
@@ -1,12 +1,21 @@
-"""Manage ingredient synonym mappings."""
+"""Manage ingredient synonym mappings.
+
+The mapping is shared by every venue.  Writers (API edits and import jobs,
+which run on per-venue workers) serialize on ``_lock`` and publish a new
+dict, so readers never see a mapping or a file that is half updated.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
 
 
-_FILE = Path(__file__).with_name("synonyms.json")
+_FILE = Path(os.getenv("SYNONYMS_FILE", Path(__file__).with_name("synonyms.json")))
 
 try:
     with _FILE.open() as f:
@@ -21,9 +30,33 @@ except FileNotFoundError:  # pragma: no cover - default when file missing
         json.dump(ALIASES, f, indent=2)
 
 
-def _save() -> None:
-    with _FILE.open("w") as f:
-        json.dump(ALIASES, f, indent=2)
+def _digest(data: bytes) -> int:
+    # A content hash survives restarts, so persisted caches detect edits made
+    # while the service was down, and unlike the file mtime it changes on
+    # every save even when two land within one timestamp tick.  Fits the
+    # snapshot header's signed 64-bit field.
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=True)
+
+
+_fingerprint = _digest(_FILE.read_bytes())
+_lock = threading.Lock()
+
+
+def _save(aliases: dict[str, str]) -> None:
+    """Write ``aliases`` and make it the live mapping; hold ``_lock``."""
+    global ALIASES, _fingerprint
+    data = json.dumps(aliases, indent=2).encode()
+    fd, tmp = tempfile.mkstemp(dir=_FILE.parent, prefix=".synonyms-", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, _FILE)
+    ALIASES = aliases
+    _fingerprint = _digest(data)
+
+
+def fingerprint() -> int:
+    """Return a value that changes whenever the alias mapping is saved."""
+    return _fingerprint
 
 
 def list_synonyms() -> list[dict[str, str]]:
@@ -33,22 +66,26 @@ def list_synonyms() -> list[dict[str, str]]:
 
 def add_synonym(alias: str, canonical: str) -> dict[str, str]:
     """Add or update a synonym mapping."""
-    ALIASES[alias.strip().lower()] = canonical.strip().title()
-    _save()
+    with _lock:
+        _save({**ALIASES, alias.strip().lower(): canonical.strip().title()})
     return {"alias": alias.strip().lower(), "canonical": canonical.strip().title()}
 
 
 def delete_synonym(alias: str) -> None:
     """Remove a synonym if present."""
-    ALIASES.pop(alias.strip().lower(), None)
-    _save()
+    with _lock:
+        aliases = dict(ALIASES)
+        aliases.pop(alias.strip().lower(), None)
+        _save(aliases)
 
 
 def import_synonyms(mapping: dict[str, str]) -> None:
     """Import multiple synonym mappings."""
-    for alias, canonical in mapping.items():
-        ALIASES[alias.strip().lower()] = canonical.strip().title()
-    _save()
+    with _lock:
+        aliases = dict(ALIASES)
+        for alias, canonical in mapping.items():
+            aliases[alias.strip().lower()] = canonical.strip().title()
+        _save(aliases)
 
 def canonical_name(name: str) -> str:
     """Return a normalized ingredient name using known aliases."""
@@ -0,0 +1,81 @@
+"""Check that simultaneous identical ``/suggestions`` calls share one scan.
+
+``crud.get_suggestions`` is wrapped to count invocations and to take at
+least ``--scan-ms``, so every caller arrives while the first scan is still
+running.  Exits non-zero unless exactly one scan served all callers.
+
+    python -m backend.benchmarks.coalescing [--callers 32] [--scan-ms 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.app.db import crud
+from backend.app.main import app
+from backend.app.services import coalesce
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=32)
+    parser.add_argument("--scan-ms", type=float, default=200.0)
+    args = parser.parse_args(argv)
+
+    scans = 0
+    original = crud.get_suggestions
+
+    def slow_scan(*a, **kw):
+        nonlocal scans
+        scans += 1
+        time.sleep(args.scan_ms / 1000)
+        return original(*a, **kw)
+
+    crud.get_suggestions = slow_scan
+    barrier = threading.Barrier(args.callers)
+    statuses: list[int] = []
+    bodies: list[list] = []
+
+    with TestClient(app) as client:
+
+        def call():
+            barrier.wait()
+            res = client.get("/suggestions/", params={"limit": 20})
+            statuses.append(res.status_code)
+            bodies.append(res.json())
+
+        before = coalesce.metrics().get("suggestions", {"calls": 0, "executions": 0})
+        threads = [threading.Thread(target=call) for _ in range(args.callers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        after = coalesce.metrics()["suggestions"]
+
+    crud.get_suggestions = original
+    calls = after["calls"] - before["calls"]
+    executions = after["executions"] - before["executions"]
+    print(f"callers       {args.callers}")
+    print(f"db scans      {scans}")
+    print(f"executions    {executions} of {calls} calls")
+    print(f"wall time     {elapsed * 1000:.0f} ms")
+    print(f"ratio (total) {after['ratio']:.3f}")
+
+    ok = (
+        scans == 1
+        and statuses == [200] * args.callers
+        and all(b == bodies[0] for b in bodies)
+    )
+    print("OK" if ok else "FAILED: expected one scan shared by all callers")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
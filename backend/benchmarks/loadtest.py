@@ -0,0 +1,307 @@
+"""Replay a bar-night traffic mix against a locally started API.
+
+The harness seeds a fresh SQLite database of configurable size, starts
+``uvicorn backend.app.main:app`` on it and drives it with closed-loop virtual
+clients through a scripted sequence of phases (opening, service, rush,
+closing).  Each phase weights the actions a real night produces: inventory
+polling, PATCH bursts while drinks are poured, suggestion queries, recipe
+detail views and the occasional synonym edit.
+
+Per-route throughput and p50/p95/p99 latencies are printed and optionally
+written as JSON.  A run fails (exit code 1) when a route breaks an absolute
+threshold or, given ``--baseline``, when its p95 regresses by more than
+``--max-regression`` against the baseline file.
+
+    python -m backend.benchmarks.loadtest --recipes 5000 --scale 0.5
+    python -m backend.benchmarks.loadtest --output base.json
+    python -m backend.benchmarks.loadtest --baseline base.json --max-regression 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from backend.app.db import models
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SYNONYMS_FILE = REPO_ROOT / "backend" / "app" / "services" / "synonyms.json"
+
+# Phase durations are in seconds before --scale is applied; weights are
+# relative. A "patch_burst" is several PATCHes back to back, as when a
+# bartender books a round.
+DEFAULT_CONFIG = {
+    "phases": [
+        {"name": "opening", "duration": 10, "clients": 4,
+         "mix": {"poll_inventory": 6, "recipe_detail": 3, "suggestions": 1}},
+        {"name": "service", "duration": 30, "clients": 12,
+         "mix": {"poll_inventory": 5, "patch_burst": 3, "suggestions": 3,
+                 "recipe_detail": 2, "synonym_edit": 0.1}},
+        {"name": "rush", "duration": 20, "clients": 24,
+         "mix": {"poll_inventory": 4, "patch_burst": 5, "suggestions": 4,
+                 "recipe_detail": 1}},
+        {"name": "closing", "duration": 10, "clients": 4,
+         "mix": {"poll_inventory": 3, "suggestions": 1, "synonym_edit": 0.2}},
+    ],
+    "think_time_ms": [20, 200],
+    "patch_burst_size": [2, 6],
+    "thresholds": {
+        "*": {"p99_ms": 1000, "error_rate": 0.01},
+        "GET /suggestions/": {"p95_ms": 250},
+        "PATCH /inventory/{id}": {"p95_ms": 200},
+    },
+}
+
+
+def seed_database(path: Path, recipes: int, ingredients: int, seed: int) -> None:
+    """Create a database with synthetic ingredients, recipes and stock."""
+    rng = random.Random(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    names = [f"Ingredient {i}" for i in range(ingredients)]
+    # Skew ingredient popularity so a few spirits appear in most recipes.
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(ingredients)]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Ingredient),
+            [{"id": i + 1, "name": name} for i, name in enumerate(names)],
+        )
+        conn.execute(
+            insert(models.InventoryItem),
+            [
+                {
+                    "ingredient_id": i + 1,
+                    "quantity": rng.choice([0, 0, 1, 2, 5, 10]),
+                    "status": "available",
+                }
+                for i in range(ingredients)
+            ],
+        )
+        conn.execute(
+            insert(models.Recipe),
+            [{"id": r + 1, "name": f"Recipe {r}"} for r in range(recipes)],
+        )
+        rows = []
+        for r in range(recipes):
+            chosen: set[str] = set()
+            while len(chosen) < rng.randint(3, 6):
+                chosen.add(rng.choices(names, weights)[0])
+            rows.extend({"recipe_id": r + 1, "name": n, "measure": "1 oz"} for n in chosen)
+        conn.execute(insert(models.RecipeIngredient), rows)
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path: Path, synonyms_path: Path, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=REPO_ROOT,
+        env={
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "SYNONYMS_FILE": str(synonyms_path),
+        },
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/healthz").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("API server did not become healthy")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kw):
+        started = time.perf_counter()
+        try:
+            res = await client.request(method, url, **kw)
+            failed = res.status_code >= 500
+        except httpx.HTTPError:
+            res, failed = None, True
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if failed:
+            self.errors[route] += 1
+        return res
+
+
+class Traffic:
+    def __init__(self, config: dict, recorder: Recorder, recipes: list[int], items: list[int], rng: random.Random):
+        self.config = config
+        self.rec = recorder
+        self.recipes = recipes
+        self.items = items
+        self.rng = rng
+
+    async def poll_inventory(self, client):
+        await self.rec.request(client, "GET /inventory/", "GET", "/inventory/")
+
+    async def patch_burst(self, client):
+        lo, hi = self.config["patch_burst_size"]
+        for _ in range(self.rng.randint(lo, hi)):
+            item = self.rng.choice(self.items)
+            await self.rec.request(
+                client, "PATCH /inventory/{id}", "PATCH", f"/inventory/{item}",
+                json={"quantity": self.rng.randint(0, 10)},
+            )
+
+    async def suggestions(self, client):
+        await self.rec.request(
+            client, "GET /suggestions/", "GET", "/suggestions/",
+            params={"limit": 20, "max_missing": self.rng.choice([0, 1, 2])},
+        )
+
+    async def recipe_detail(self, client):
+        recipe = self.rng.choice(self.recipes)
+        await self.rec.request(client, "GET /recipes/{id}", "GET", f"/recipes/{recipe}")
+
+    async def synonym_edit(self, client):
+        alias = f"loadtest alias {self.rng.randrange(1000)}"
+        await self.rec.request(
+            client, "POST /synonyms/", "POST", "/synonyms/",
+            json={"alias": alias, "canonical": "Ingredient 0"},
+        )
+        await self.rec.request(client, "DELETE /synonyms/{alias}", "DELETE", f"/synonyms/{alias}")
+
+    async def run_phase(self, base_url: str, phase: dict, scale: float) -> None:
+        actions, weights = zip(*phase["mix"].items())
+        deadline = time.monotonic() + phase["duration"] * scale
+        think_lo, think_hi = self.config["think_time_ms"]
+
+        async def client_loop():
+            async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+                while time.monotonic() < deadline:
+                    action = self.rng.choices(actions, weights)[0]
+                    await getattr(self, action)(client)
+                    await asyncio.sleep(self.rng.uniform(think_lo, think_hi) / 1000)
+
+        await asyncio.gather(*(client_loop() for _ in range(phase["clients"])))
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict[str, dict]:
+    summary = {}
+    for route, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        summary[route] = {
+            "requests": len(values),
+            "rps": len(values) / elapsed,
+            "error_rate": recorder.errors[route] / len(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "p99_ms": _percentile(values, 99),
+        }
+    return summary
+
+
+def check(summary: dict, thresholds: dict, baseline: dict | None, max_regression: float) -> list[str]:
+    failures = []
+    for route, stats in summary.items():
+        limits = {**thresholds.get("*", {}), **thresholds.get(route, {})}
+        for metric, limit in limits.items():
+            if stats[metric] > limit:
+                failures.append(f"{route}: {metric} {stats[metric]:.3f} > {limit}")
+        base = (baseline or {}).get(route)
+        if base and base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(
+                f"{route}: p95 {stats['p95_ms']:.1f} ms regressed more than "
+                f"{max_regression:.0%} from baseline {base['p95_ms']:.1f} ms"
+            )
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--ingredients", type=int, default=300)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply phase durations")
+    parser.add_argument("--config", type=Path, help="JSON file overriding DEFAULT_CONFIG keys")
+    parser.add_argument("--baseline", type=Path, help="summary JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, help="write the summary JSON here")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    config = dict(DEFAULT_CONFIG)
+    if args.config:
+        config.update(json.loads(args.config.read_text()))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "loadtest.sqlite"
+        seed_database(db_path, args.recipes, args.ingredients, args.seed)
+        # Synonym edits go to a copy, never to the checkout's synonyms.json.
+        synonyms_path = Path(tmp) / "synonyms.json"
+        shutil.copyfile(SYNONYMS_FILE, synonyms_path)
+        port = _free_port()
+        server = start_server(db_path, synonyms_path, port)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            items = [i["id"] for i in httpx.get(f"{base_url}/inventory/", params={"limit": 1000}).json()]
+            recorder = Recorder()
+            traffic = Traffic(config, recorder, list(range(1, args.recipes + 1)), items, rng)
+            started = time.perf_counter()
+            for phase in config["phases"]:
+                print(f"phase {phase['name']}: {phase['clients']} clients", flush=True)
+                asyncio.run(traffic.run_phase(base_url, phase, args.scale))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    summary = summarize(recorder, elapsed)
+    print(f"\n{'route':<28}{'req':>7}{'rps':>8}{'err%':>7}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for route, s in summary.items():
+        print(
+            f"{route:<28}{s['requests']:>7}{s['rps']:>8.1f}{s['error_rate'] * 100:>7.2f}"
+            f"{s['p50_ms']:>8.1f}{s['p95_ms']:>8.1f}{s['p99_ms']:>8.1f}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2))
+
+    failures = check(summary, config["thresholds"], baseline, args.max_regression)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Measure time-to-first-fast-response for ``/suggestions`` after a restart.
+
+Each run starts a fresh interpreter against a copy of the database, so import
+cost and ``synonyms.json`` parsing are included.  "Cold" runs delete the
+snapshot first; "warm" runs reuse the one left behind by the previous run.
+
+    python -m backend.benchmarks.startup [--db backend/data/seed.sqlite] [--runs 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+from backend.app.main import app
+from backend.app.db.session import SessionLocal
+from backend.app.services import snapshot
+
+with TestClient(app) as client:
+    started = time.perf_counter()
+    t = time.perf_counter()
+    client.get("/suggestions/").raise_for_status()
+    first_ms = (time.perf_counter() - t) * 1000
+    deadline = time.perf_counter() + float(sys.argv[1])
+    while time.perf_counter() < deadline:
+        with SessionLocal() as db:
+            if snapshot.current(db) is not None:
+                break
+        time.sleep(0.005)
+    t = time.perf_counter()
+    client.get("/suggestions/").raise_for_status()
+    fast_ms = (time.perf_counter() - t) * 1000
+    ready = time.perf_counter()
+
+print(json.dumps({
+    "startup_s": started - t0,
+    "first_response_ms": first_ms,
+    "fast_response_ms": fast_ms,
+    "time_to_fast_s": ready - t0,
+}))
+"""
+
+
+def _run(db_path: Path, timeout: float) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(timeout)],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="backend/data/seed.sqlite")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.sqlite"
+        shutil.copy(args.db, db_path)
+        snap_path = db_path.with_suffix(".snapshot")
+
+        results: dict[str, list[dict]] = {"cold": [], "warm": []}
+        for _ in range(args.runs):
+            snap_path.unlink(missing_ok=True)
+            results["cold"].append(_run(db_path, args.timeout))
+            results["warm"].append(_run(db_path, args.timeout))
+
+    for label, runs in results.items():
+        print(label)
+        for key in runs[0]:
+            scale = 1 if key.endswith("_ms") else 1000
+            median = statistics.median(r[key] for r in runs) * scale
+            print(f"  {key:<20} median {median:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
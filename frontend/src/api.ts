@@ -259,7 +259,8 @@ export async function findRecipes(options: FindRecipesOptions = {}) {
   const res = await fetch(
     `${API_BASE}/search${query ? `?${query}` : ""}`,
   );
-  return res.json();
+  const body = await res.json();
+  return Array.isArray(body?.recipes) ? body.recipes : [];
 }
 
 export async function listMacros() {
@@ -340,6 +341,30 @@ export async function deleteRecipe(id: number) {
   }
 }
 
+export interface BatchResponse {
+  id?: string;
+  status: number;
+  body: unknown;
+}
+
+// Run several GET requests in one round trip; results share one DB snapshot.
+export async function batchGet(paths: Record<string, string>) {
+  const requests = Object.entries(paths).map(([id, path]) => ({ id, path }));
+  const { data, debug } = await fetchJson<{ responses: BatchResponse[] }>(
+    `${API_BASE}/batch/`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ requests }),
+    },
+  );
+  const results: Record<string, BatchResponse> = {};
+  for (const res of data?.responses ?? []) {
+    if (res.id) results[res.id] = res;
+  }
+  return { results, debug };
+}
+
 export async function listSynonyms() {
   return fetchJson<Synonym[]>(`${API_BASE}/synonyms/`);
 }
@@ -359,11 +384,13 @@ export async function deleteSynonym(alias: string) {
 }
 
 export async function importSynonyms(data: Record<string, string>) {
-  return fetchJson<void>(`${API_BASE}/synonyms/import`, {
+  const res = await fetchJson<Job>(`${API_BASE}/synonyms/import`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
   });
+  if (res.data) await waitForJob(res.data.id);
+  return res;
 }
 
 export async function listUnitSynonyms() {
@@ -393,10 +420,39 @@ export async function importUnitSynonyms(data: Record<string, string>) {
   });
 }
 
+export interface Job {
+  id: number;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled";
+  progress: number;
+  message: string | null;
+  result: Record<string, unknown> | null;
+  error: string | null;
+}
+
+export async function getJob(id: number) {
+  return fetchJson<Job>(`${API_BASE}/jobs/${id}`);
+}
+
+export async function cancelJob(id: number) {
+  return fetchJson<Job>(`${API_BASE}/jobs/${id}/cancel`, { method: "POST" });
+}
+
+// Poll until the job leaves the queue so callers can refresh afterwards.
+async function waitForJob(id: number, intervalMs = 500): Promise<Job | null> {
+  for (;;) {
+    const { data } = await getJob(id);
+    if (!data || !["queued", "running"].includes(data.status)) return data;
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 export async function aggregateInventorySynonyms() {
-  return fetchJson<void>(`${API_BASE}/inventory/aggregate-synonyms`, {
+  const res = await fetchJson<Job>(`${API_BASE}/inventory/aggregate-synonyms`, {
     method: "POST",
   });
+  if (res.data) await waitForJob(res.data.id);
+  return res;
 }
 
 export interface ShoppingListItem {
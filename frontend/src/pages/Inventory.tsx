@@ -10,8 +10,7 @@ import {
   deleteInventory,
   aggregateInventorySynonyms,
   lookupBarcode,
-  listIngredients,
-  listSynonyms,
+  batchGet,
   type BarcodeResult,
   type FetchDebug,
   type Ingredient,
@@ -77,14 +76,14 @@ export default function Inventory() {
   }, [search, sort, order])
 
   useEffect(() => {
-    listIngredients().then(({ data, debug }) => {
-      if (debug) addDebug(debug)
-      if (data) setIngredients(data)
-    })
-    listSynonyms().then(({ data, debug }) => {
-      if (debug) addDebug(debug)
-      if (data) setSynonyms(data)
-    })
+    batchGet({ ingredients: '/ingredients/', synonyms: '/synonyms/' }).then(
+      ({ results, debug }) => {
+        addDebug(debug)
+        const { ingredients, synonyms } = results
+        if (ingredients?.status === 200) setIngredients(ingredients.body as Ingredient[])
+        if (synonyms?.status === 200) setSynonyms(synonyms.body as Synonym[])
+      },
+    )
   }, [])
 
   const runLookup = async (code: string) => {